@@ -25,18 +25,20 @@ setup(
     },
     packages=find_packages(),
     include_package_data=True,
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     install_requires=[
         'requests>=2.20.0',
         'urllib3>=1.20',
     ],
     extras_require={
+        'async': ['httpx>=0.18.0'],
         'bottle': ['bottle>=0.12.13'],
         'celery': ['celery>=3'],
         'django': ['django>=1.8'],
-        'fastapi': ['fastapi>=0.79.0'],
+        'fastapi': ['fastapi>=0.79.0', 'httpx>=0.18.0'],
         'flask': ['flask>=0.11', 'blinker>=1.1', 'markupsafe'],
-        'rq': ['rq>=0.6']
+        'rq': ['rq>=0.6'],
+        'speedups': ['orjson>=3.0', 'zstandard>=0.15'],
     },
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -46,7 +48,6 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
@@ -1,12 +1,12 @@
 from streply_sdk.api import (
-    init, capture_exception, capture_message, add_breadcrumb,
-    configure_scope, set_user, set_tag, set_extra,
-    trace, last_event_id
+    init, capture_exception, capture_message, add_breadcrumb, add_event_processor,
+    configure_scope, push_scope, set_user, set_tag, set_extra,
+    trace, trace_ctx, last_event_id, flush, flush_async, close, aclose
 )
 
 
 __all__ = [
-    'init', 'capture_exception', 'capture_message', 'add_breadcrumb',
-    'configure_scope', 'set_user', 'set_tag', 'set_extra',
-    'trace', 'last_event_id',
+    'init', 'capture_exception', 'capture_message', 'add_breadcrumb', 'add_event_processor',
+    'configure_scope', 'push_scope', 'set_user', 'set_tag', 'set_extra',
+    'trace', 'trace_ctx', 'last_event_id', 'flush', 'flush_async', 'close', 'aclose',
 ]
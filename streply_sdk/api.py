@@ -1,11 +1,12 @@
 import logging
 import threading
 import functools
-import time
+import inspect
 from contextlib import contextmanager
-from typing import Dict, Optional, List, Type, Union, Callable
+from typing import Any, Dict, Optional, List, Type, Union, Callable
 
 from streply_sdk.core.client import Client
+from streply_sdk.core.transport import Transport
 from streply_sdk.integrations.base import Integration
 
 _client = None
@@ -23,9 +24,24 @@ def init(
     traces_sample_rate: float = 1.0,
     max_breadcrumbs: int = 100,
     sample_rate: float = 1.0,
+    sample_rates: Optional[Dict[str, float]] = None,
+    logger_sample_rates: Optional[Dict[str, float]] = None,
+    exception_sample_rates: Optional[Dict[str, float]] = None,
+    traces_sampler: Optional[Callable[[Dict[str, Any]], Union[float, bool]]] = None,
+    max_events_per_second: Optional[float] = None,
+    max_spans: int = 1000,
     hooks: Optional[Dict[str, Callable]] = None,
-    transport=None,
+    transport: Optional[Union[Transport, Type[Transport], str]] = None,
     debug: bool = False,
+    shutdown_timeout: Optional[float] = 2.0,
+    deferred_capture: bool = False,
+    aggregation_window: Optional[float] = None,
+    scrub_data: bool = True,
+    attach_environment: bool = False,
+    ignore_exceptions: Optional[List[Union[Type[BaseException], str]]] = None,
+    ignore_loggers: Optional[List[str]] = None,
+    ignore_messages: Optional[List[str]] = None,
+    ignore_urls: Optional[List[str]] = None,
     **options
 ):
     global _client
@@ -43,10 +59,25 @@ def init(
             send_default_pii=send_default_pii,
             max_breadcrumbs=max_breadcrumbs,
             sample_rate=sample_rate,
+            sample_rates=sample_rates,
+            logger_sample_rates=logger_sample_rates,
+            exception_sample_rates=exception_sample_rates,
+            traces_sampler=traces_sampler,
+            max_events_per_second=max_events_per_second,
+            max_spans=max_spans,
             hooks=hooks,
             transport=transport,
             debug=debug,
             traces_sample_rate=traces_sample_rate,
+            shutdown_timeout=shutdown_timeout,
+            deferred_capture=deferred_capture,
+            aggregation_window=aggregation_window,
+            scrub_data=scrub_data,
+            attach_environment=attach_environment,
+            ignore_exceptions=ignore_exceptions,
+            ignore_loggers=ignore_loggers,
+            ignore_messages=ignore_messages,
+            ignore_urls=ignore_urls,
             **options
         )
 
@@ -70,8 +101,40 @@ def capture_message(message, **kwargs):
     return _ensure_client().capture_message(message, **kwargs)
 
 
+def flush(timeout=None):
+    return _ensure_client().flush(timeout)
+
+
+async def flush_async(timeout=None):
+    return await _ensure_client().flush_async(timeout)
+
+
+def close(timeout=None):
+    global _client
+
+    with _client_init_lock:
+        client = _ensure_client()
+        _client = None
+
+    return client.close(timeout)
+
+
+async def aclose(timeout=None):
+    global _client
+
+    with _client_init_lock:
+        client = _ensure_client()
+        _client = None
+
+    return await client.aclose(timeout)
+
+
+def add_event_processor(func, priority=0, name=None):
+    return _ensure_client().add_event_processor(func, priority, name)
+
+
 def add_breadcrumb(category=None, message=None, level='info', data=None):
-    _ensure_client().context.add_breadcrumb(
+    _ensure_client().add_breadcrumb(
         category=category,
         message=message,
         level=level,
@@ -81,13 +144,14 @@ def add_breadcrumb(category=None, message=None, level='info', data=None):
 
 @contextmanager
 def configure_scope():
-    client = _ensure_client()
-    scope = client.context.push_scope()
+    with _ensure_client().configure_scope() as scope:
+        yield scope
 
-    try:
+
+@contextmanager
+def push_scope():
+    with _ensure_client().push_scope() as scope:
         yield scope
-    finally:
-        client.context.pop_scope()
 
 
 def set_user(user):
@@ -102,15 +166,87 @@ def set_extra(key, value):
     _ensure_client().context.set_extra(key, value)
 
 
+def _trace_generator(generator, span):
+    span.start()
+    method, argument = generator.send, None
+
+    try:
+        while True:
+            try:
+                item = method(argument)
+            except StopIteration as stop:
+                return stop.value
+
+            span.suspend()
+            try:
+                argument = yield item
+                method = generator.send
+            except GeneratorExit:
+                generator.close()
+                raise
+            except BaseException as e:
+                method, argument = generator.throw, e
+            finally:
+                span.resume()
+    except Exception:
+        span.set_status('error')
+        raise
+    finally:
+        span.finish()
+
+
+async def _trace_async_generator(generator, span):
+    span.start()
+    method, argument = generator.asend, None
+
+    try:
+        while True:
+            try:
+                item = await method(argument)
+            except StopAsyncIteration:
+                return
+
+            span.suspend()
+            try:
+                argument = yield item
+                method = generator.asend
+            except GeneratorExit:
+                await generator.aclose()
+                raise
+            except BaseException as e:
+                method, argument = generator.athrow, e
+            finally:
+                span.resume()
+    except Exception:
+        span.set_status('error')
+        raise
+    finally:
+        span.finish()
+
+
 def trace(func=None, name=None, op=None):
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            with trace_ctx(
-                name=name or func.__name__,
-                op=op or f'function.{func.__module__}.{func.__name__}'
-            ):
-                return func(*args, **kwargs)
+        span_name = name or func.__name__
+        span_op = op or f'function.{func.__module__}.{func.__name__}'
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with trace_ctx(name=span_name, op=span_op):
+                    return await func(*args, **kwargs)
+        elif inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return _trace_async_generator(func(*args, **kwargs), trace_ctx(name=span_name, op=span_op))
+        elif inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return _trace_generator(func(*args, **kwargs), trace_ctx(name=span_name, op=span_op))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with trace_ctx(name=span_name, op=span_op):
+                    return func(*args, **kwargs)
 
         return wrapper
 
@@ -120,27 +256,8 @@ def trace(func=None, name=None, op=None):
     return decorator(func)
 
 
-@contextmanager
 def trace_ctx(name, op=None):
-    client = _ensure_client()
-    start_time = time.time()
-
-    try:
-        yield
-    finally:
-        end_time = time.time()
-        duration = (end_time - start_time) * 1000  # ms
-
-        if client.options.get('traces_sample_rate', 0) > 0:
-            client.capture_message(
-                f'Performance: {name}',
-                type='performance',
-                params={
-                    'operation': op or 'code.execution',
-                    'name': name,
-                    'duration_ms': duration
-                }
-            )
+    return _ensure_client().start_span(name, op)
 
 
 def last_event_id():
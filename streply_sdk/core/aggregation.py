@@ -0,0 +1,177 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TEMPLATE_PATTERN = re.compile(
+    r"'[^']*'"
+    r'|"[^"]*"'
+    r'|\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b'
+    r'|\b0x[0-9a-f]+\b'
+    r'|\b\d+(?:\.\d+)?\b',
+    re.IGNORECASE
+)
+
+
+def get_message_template(message: Optional[str]) -> str:
+    if not message:
+        return ''
+
+    return _TEMPLATE_PATTERN.sub('<var>', message)
+
+
+class Aggregate:
+    __slots__ = ('key', 'info', 'count', 'first_seen', 'last_seen', 'samples', '_sample_keys', 'expires_at')
+
+    def __init__(self, key, info: Dict[str, Any], timestamp: float, expires_at: float):
+        self.key = key
+        self.info = info
+        self.count = 1
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.samples = []
+        self._sample_keys = set()
+        self.expires_at = expires_at
+
+    def add_sample(self, params: Optional[Dict[str, Any]], max_samples: int):
+        if not params or len(self.samples) >= max_samples:
+            return
+
+        try:
+            sample_key = repr(sorted(params.items()))
+        except Exception:
+            return
+
+        if sample_key not in self._sample_keys:
+            self._sample_keys.add(sample_key)
+            self.samples.append(params)
+
+
+class EventAggregator:
+    def __init__(
+        self,
+        window: float = 60.0,
+        max_keys: int = 1000,
+        max_samples: int = 10,
+        on_summary: Optional[Callable[[Aggregate], None]] = None
+    ):
+        self.window = window
+        self.max_keys = max_keys
+        self.max_samples = max_samples
+        self.on_summary = on_summary
+
+        self._aggregates = OrderedDict()
+        self._suppressed = 0
+        self._summaries = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._stopped = False
+
+    def add(self, key, info: Dict[str, Any], timestamp: float, params: Optional[Dict[str, Any]] = None) -> bool:
+        now = time.monotonic()
+        expired = []
+
+        with self._lock:
+            aggregate = self._aggregates.get(key)
+
+            if aggregate is not None and aggregate.expires_at > now:
+                aggregate.count += 1
+                aggregate.last_seen = timestamp
+                aggregate.add_sample(params, self.max_samples)
+                self._suppressed += 1
+
+                if aggregate.count == 2:
+                    self._ensure_thread()
+
+                return False
+
+            if aggregate is not None:
+                del self._aggregates[key]
+                expired.append(aggregate)
+
+            aggregate = Aggregate(key, info, timestamp, now + self.window)
+            aggregate.add_sample(params, self.max_samples)
+            self._aggregates[key] = aggregate
+
+            while len(self._aggregates) > self.max_keys:
+                expired.append(self._aggregates.popitem(last=False)[1])
+
+        self._emit(expired)
+        return True
+
+    def _ensure_thread(self):
+        if self._stopped or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        self._thread = threading.Thread(target=self._run, name='streply-aggregator', daemon=True)
+        self._thread.start()
+
+    def _pop_expired(self, now: float) -> List[Aggregate]:
+        expired = []
+
+        while self._aggregates:
+            aggregate = next(iter(self._aggregates.values()))
+            if aggregate.expires_at > now:
+                break
+
+            del self._aggregates[aggregate.key]
+            expired.append(aggregate)
+
+        return expired
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+
+                expired = self._pop_expired(time.monotonic())
+
+                if not expired:
+                    if self._aggregates:
+                        timeout = next(iter(self._aggregates.values())).expires_at - time.monotonic()
+                    else:
+                        timeout = self.window
+
+                    self._wakeup.wait(max(0.0, timeout))
+                    continue
+
+            self._emit(expired)
+
+    def _emit(self, aggregates: List[Aggregate]):
+        for aggregate in aggregates:
+            if aggregate.count < 2 or self.on_summary is None:
+                continue
+
+            self._summaries += 1
+
+            try:
+                self.on_summary(aggregate)
+            except Exception as e:
+                logger.error(f'Error sending Streply aggregated event: {e}')
+
+    def flush(self):
+        with self._lock:
+            aggregates = list(self._aggregates.values())
+            self._aggregates.clear()
+
+        self._emit(aggregates)
+
+    def close(self):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify_all()
+
+        self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'active': len(self._aggregates),
+            'suppressed': self._suppressed,
+            'summaries': self._summaries
+        }
@@ -0,0 +1,421 @@
+import asyncio
+import logging
+import random
+import threading
+import urllib.parse
+from typing import Dict, Any, List, Optional
+
+from streply_sdk.core.event import DeferredEvent
+from streply_sdk.core.retry import CircuitBreaker, PendingDelivery, parse_retry_after
+from streply_sdk.core.transport import RETRYABLE_STATUS_CODES, Transport, HttpTransport
+from streply_sdk.utils.encoding import ENCODING_NONE, compress, dumps, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+
+def is_available():
+    try:
+        import httpx  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _item_count(item) -> int:
+    return item.count if isinstance(item, PendingDelivery) else 1
+
+
+class AsyncHttpTransport(Transport):
+    supports_deferred = True
+
+    def __init__(
+        self,
+        dsn: str,
+        timeout: float = 2.0,
+        queue_size: int = 10000,
+        retry_max: int = 3,
+        retry_delay: float = 0.5,
+        retry_max_delay: float = 30.0,
+        pool_size: int = 4,
+        pool_idle_timeout: Optional[float] = 60.0,
+        compression_threshold: int = 1024,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_timeout: float = 30.0
+    ):
+        super().__init__(dsn)
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.retry_max = retry_max
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.pool_size = max(1, pool_size)
+        self.pool_idle_timeout = pool_idle_timeout
+        self.compression_threshold = compression_threshold
+
+        parsed = urllib.parse.urlparse(dsn)
+        self.public_key = parsed.username
+        self.project_id = parsed.path.strip('/')
+        self.api_url = f'{parsed.scheme}://{parsed.netloc}'
+
+        self._loop = None
+        self._queue = None
+        self._client = None
+        self._worker_tasks = []
+        self._parked = {}
+        self._in_flight = 0
+        self._parked_done = None
+        self._breaker = CircuitBreaker(breaker_failure_threshold, breaker_recovery_timeout)
+        self._fallback = None
+        self._bind_lock = threading.Lock()
+        self._drop_counts = {}
+        self._delivered = 0
+        self._abandoned = 0
+        self._server_encoding = ENCODING_NONE
+
+    def _bind(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._parked_done = asyncio.Event()
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.pool_size)]
+
+        logger.debug('Bound Streply async transport to event loop')
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.pool_idle_timeout
+                ),
+                headers=self._get_headers()
+            )
+
+        return self._client
+
+    def _get_fallback(self) -> HttpTransport:
+        with self._bind_lock:
+            if self._fallback is None:
+                logger.debug('No running event loop, using HttpTransport for Streply events')
+                self._fallback = HttpTransport(self.dsn, timeout=self.timeout, queue_size=self.queue_size)
+
+            return self._fallback
+
+    def _get_headers(self) -> Dict[str, str]:
+        return {
+            'Content-Type': 'application/json',
+            'Token': self.public_key,
+            'ProjectId': self.project_id
+        }
+
+    def _record_drop(self, reason: str, count: int = 1):
+        self._drop_counts[reason] = self._drop_counts.get(reason, 0) + count
+
+    def _abandon(self, count: int):
+        if count:
+            self._record_drop('closed', count)
+            self._abandoned += count
+
+    def get_drop_stats(self) -> Dict[str, int]:
+        stats = dict(self._drop_counts)
+
+        if self._fallback is not None:
+            for reason, count in self._fallback.get_drop_stats().items():
+                stats[reason] = stats.get(reason, 0) + count
+
+        return stats
+
+    def _enqueue(self, event: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._record_drop('queue_full')
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            count = _item_count(item)
+            self._in_flight += count
+
+            try:
+                if not isinstance(item, PendingDelivery):
+                    item = await self._prepare(item)
+
+                if item is not None:
+                    await self._deliver(item)
+            except asyncio.CancelledError:
+                try:
+                    self._queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    self._abandon(count)
+                raise
+            except Exception as e:
+                logger.error(f'Unexpected error in Streply async worker: {e}')
+            finally:
+                self._in_flight -= count
+                self._queue.task_done()
+
+    async def _prepare(self, event: Dict[str, Any]) -> Optional[PendingDelivery]:
+        if isinstance(event, DeferredEvent):
+            event = await asyncio.get_running_loop().run_in_executor(None, self._materialize, event)
+            if event is None:
+                return None
+
+        encoded = dumps(event)
+        data = encoded
+        headers = {}
+
+        encoding = self._server_encoding
+        if encoding != ENCODING_NONE and len(data) >= self.compression_threshold:
+            data = compress(data, encoding)
+            headers['Content-Encoding'] = encoding
+
+        return PendingDelivery(data, headers, [encoded], batch=False)
+
+    async def _deliver(self, item: PendingDelivery):
+        if not self._breaker.allow_request():
+            self._park(item, max(self._breaker.retry_in(), self.retry_delay))
+            return
+
+        response = None
+        error = None
+
+        try:
+            response = await self._get_client().post(self.api_url, content=item.data, headers=item.headers)
+        except Exception as e:
+            error = e
+
+        status = response.status_code if response is not None else None
+
+        if status == 200:
+            self._breaker.record_success()
+            self._delivered += 1
+            self._server_encoding = negotiate_encoding(response.headers.get('Accept-Encoding'))
+
+            try:
+                self.last_event_id = response.json().get('id')
+            except Exception as e:
+                logger.error(f'Error parsing response: {e}')
+            return
+
+        if status is not None and status < 500 and status not in RETRYABLE_STATUS_CODES:
+            self._breaker.record_success()
+            logger.warning(f'Streply rejected {item.count} events: HTTP {status}')
+            self._record_drop('rejected', item.count)
+            return
+
+        self._breaker.record_failure()
+        item.attempt += 1
+
+        reason = f'HTTP {status}' if status is not None else error
+        logger.warning(f'Error sending event to Streply (attempt {item.attempt}/{self.retry_max}): {reason}')
+
+        if item.attempt >= self.retry_max:
+            self._record_drop('retry_exhausted', item.count)
+            return
+
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+        if retry_after is None:
+            retry_after = random.uniform(0, min(self.retry_max_delay, self.retry_delay * (2 ** item.attempt)))
+
+        self._park(item, retry_after)
+
+    @property
+    def circuit_state(self) -> str:
+        return self._breaker.state
+
+    def _park(self, item: PendingDelivery, delay: float):
+        if len(self._parked) >= self.queue_size:
+            self._record_drop('retry_exhausted', item.count)
+            return
+
+        handle = None
+
+        def requeue():
+            self._parked.pop(handle, None)
+
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self._record_drop('queue_full', item.count)
+
+            if not self._parked:
+                self._parked_done.set()
+
+        self._parked_done.clear()
+        handle = self._loop.call_later(delay, requeue)
+        self._parked[handle] = item
+
+    async def _drain(self):
+        while True:
+            await self._queue.join()
+
+            if not self._parked:
+                return
+
+            await self._parked_done.wait()
+
+    def send(self, event: Dict[str, Any]) -> Optional[str]:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if self._loop is None and running_loop is not None:
+            with self._bind_lock:
+                if self._loop is None:
+                    self._bind(running_loop)
+
+        if self._loop is None or self._loop.is_closed():
+            return self._get_fallback().send(event)
+
+        if running_loop is self._loop:
+            self._enqueue(event)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, event)
+
+        return None
+
+    async def send_async(self, event: Dict[str, Any]) -> None:
+        if self._loop is None:
+            self.send(event)
+            return
+
+        await self._queue.put(event)
+
+    async def flush_async(self, timeout: Optional[float] = None) -> bool:
+        flushed = True
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._drain(), timeout)
+            except asyncio.TimeoutError:
+                flushed = False
+
+        if self._fallback is not None:
+            loop = asyncio.get_running_loop()
+            fallback_flushed = await loop.run_in_executor(None, self._fallback.flush, timeout)
+            flushed = flushed and fallback_flushed
+
+        return flushed
+
+    async def aclose(self, timeout: Optional[float] = None) -> bool:
+        flushed = await self.flush_async(timeout)
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        self._abandon(sum(_item_count(item) for item in self._take_pending()))
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+        if self._fallback is not None:
+            self._fallback.close(0)
+
+        return flushed
+
+    def get_delivery_stats(self) -> Dict[str, int]:
+        stats = {'delivered': self._delivered, 'pending': 0, 'spooled': 0, 'abandoned': 0}
+
+        stats['abandoned'] = self._abandoned
+
+        if self._queue is not None:
+            stats['pending'] = self._queue.qsize() + sum(item.count for item in self._parked.values()) + self._in_flight
+
+        if self._fallback is not None:
+            for key, value in self._fallback.get_delivery_stats().items():
+                stats[key] += value
+
+        return stats
+
+    def _run_threadsafe(self, coroutine_function, timeout: Optional[float]) -> bool:
+        loop = self._loop
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            logger.warning(f'Call "await transport.{coroutine_function.__name__}()" from inside the event loop')
+            return False
+
+        if loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(coroutine_function(timeout), loop)
+            try:
+                return future.result(None if timeout is None else timeout + 1.0)
+            except Exception as e:
+                logger.error(f'Error waiting for Streply async transport: {e}')
+                return False
+
+        return loop.run_until_complete(coroutine_function(timeout))
+
+    def _loop_available(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    def _take_pending(self) -> List[Any]:
+        items = []
+
+        if self._queue is not None:
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+        for handle, item in self._parked.items():
+            handle.cancel()
+            items.append(item)
+        self._parked.clear()
+
+        return items
+
+    def _release_to_fallback(self):
+        items = self._take_pending()
+        if not items:
+            return
+
+        logger.debug(f'Event loop closed, handing {len(items)} pending Streply deliveries to HttpTransport')
+        fallback = self._get_fallback()
+
+        for item in items:
+            if isinstance(item, PendingDelivery):
+                fallback._requeue(item.encoded_events, item.attempt)
+            else:
+                fallback.send(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if self._loop_available():
+            return self._run_threadsafe(self.flush_async, timeout)
+
+        self._release_to_fallback()
+
+        if self._fallback is not None:
+            return self._fallback.flush(timeout) and not self._in_flight
+
+        return not self._in_flight
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        if self._loop_available():
+            return self._run_threadsafe(self.aclose, timeout)
+
+        self._release_to_fallback()
+
+        in_flight = self._in_flight
+        self._in_flight = 0
+        self._abandon(in_flight)
+
+        if self._fallback is not None:
+            return self._fallback.close(timeout) and not in_flight
+
+        return not in_flight
@@ -1,14 +1,24 @@
+import atexit
+from contextlib import contextmanager
 import time
 import uuid
 import sys
 import platform
 import datetime
 import logging
-import random
-from typing import Dict, Optional, List, Type, Union
+from typing import Any, Callable, Dict, Optional, List, Type, Union
 
 from streply_sdk.core.transport import Transport, HttpTransport
+from streply_sdk.core.aggregation import EventAggregator, get_message_template
 from streply_sdk.core.context import Context
+from streply_sdk.core.filters import EventFilter
+from streply_sdk.core.processors import (
+    PRIORITY_BEFORE_SEND, PRIORITY_ENVIRONMENT, PRIORITY_SCRUB, STAGE_GLOBAL, ProcessorPipeline
+)
+from streply_sdk.core.sampling import Sampler
+from streply_sdk.core.tracing import Span
+from streply_sdk.core.event import DeferredEvent
+from streply_sdk.utils.event_processing import add_environment_data, before_send_hook
 from streply_sdk.utils.stacktrace import get_stacktrace
 from streply_sdk.integrations.base import Integration
 
@@ -25,24 +35,78 @@ class Client:
         send_default_pii: bool = True,
         max_breadcrumbs: int = 100,
         sample_rate: float = 1.0,
+        traces_sample_rate: float = 1.0,
+        sample_rates: Optional[Dict[str, float]] = None,
+        logger_sample_rates: Optional[Dict[str, float]] = None,
+        exception_sample_rates: Optional[Dict[str, float]] = None,
+        traces_sampler: Optional[Callable[[Dict[str, Any]], Union[float, bool]]] = None,
+        max_events_per_second: Optional[float] = None,
+        max_spans: int = 1000,
         hooks: Optional[Dict[str, callable]] = None,
-        transport: Optional[Transport] = None,
+        transport: Optional[Union[Transport, Type[Transport], str]] = None,
         debug: bool = False,
+        shutdown_timeout: Optional[float] = 2.0,
+        deferred_capture: bool = False,
+        aggregation_window: Optional[float] = None,
+        scrub_data: bool = True,
+        attach_environment: bool = False,
+        ignore_exceptions: Optional[List[Union[Type[BaseException], str]]] = None,
+        ignore_loggers: Optional[List[str]] = None,
+        ignore_messages: Optional[List[str]] = None,
+        ignore_urls: Optional[List[str]] = None,
         **options
     ):
         self.dsn = dsn
+        self._base_event = None
+        self._timezone_name = None
+        self._timezone_expires = 0.0
         self.environment = environment
         self.release = release
         self.send_default_pii = send_default_pii
         self.max_breadcrumbs = max_breadcrumbs
         self.sample_rate = sample_rate
+        self.traces_sample_rate = traces_sample_rate
+        self.max_spans = max_spans
         self.hooks = hooks or {}
         self.options = options
         self.debug = debug
+        self.shutdown_timeout = shutdown_timeout
+        self.deferred_capture = deferred_capture
+
+        self.filters = EventFilter(
+            ignore_exceptions=ignore_exceptions,
+            ignore_loggers=ignore_loggers,
+            ignore_messages=ignore_messages,
+            ignore_urls=ignore_urls
+        )
 
-        self.transport = transport or HttpTransport(dsn)
+        self.sampler = Sampler(
+            sample_rate=sample_rate,
+            traces_sample_rate=traces_sample_rate,
+            sample_rates=sample_rates,
+            logger_sample_rates=logger_sample_rates,
+            exception_sample_rates=exception_sample_rates,
+            traces_sampler=traces_sampler,
+            max_events_per_second=max_events_per_second
+        )
 
-        self.context = Context()
+        self.aggregator = None
+        if aggregation_window:
+            self.aggregator = EventAggregator(aggregation_window, on_summary=self._send_aggregate)
+
+        self.context = Context(max_breadcrumbs)
+
+        self.processors = ProcessorPipeline()
+        if attach_environment:
+            self.processors.add(
+                lambda event, hint: add_environment_data(event),
+                priority=PRIORITY_ENVIRONMENT,
+                name='environment'
+            )
+        if scrub_data:
+            self.processors.add(before_send_hook, priority=PRIORITY_SCRUB, name='scrub_data')
+        if 'before_send' in self.hooks:
+            self.processors.add(self.hooks['before_send'], priority=PRIORITY_BEFORE_SEND, name='before_send')
 
         self.session_id = uuid.uuid4().hex
         self.trace_id = uuid.uuid4().hex
@@ -52,8 +116,31 @@ class Client:
         self._integrations = {}
         self._load_integrations(integrations)
 
+        self.transport = self._create_transport(transport)
+
         self._install_global_excepthook()
 
+        self._closed = False
+        atexit.register(self._shutdown)
+
+    @property
+    def environment(self):
+        return self._environment
+
+    @environment.setter
+    def environment(self, value):
+        self._environment = value
+        self._base_event = None
+
+    @property
+    def release(self):
+        return self._release
+
+    @release.setter
+    def release(self, value):
+        self._release = value
+        self._base_event = None
+
     def _load_integrations(self, integrations):
         from streply_sdk.integrations import get_default_integrations
 
@@ -69,6 +156,29 @@ class Client:
                     integration = integration()
                 self._setup_integration(integration)
 
+    def _create_transport(self, transport):
+        if isinstance(transport, Transport):
+            return transport
+
+        if isinstance(transport, type) and issubclass(transport, Transport):
+            return transport(self.dsn)
+
+        if transport not in (None, 'http', 'async'):
+            raise ValueError(f'Unknown transport: {transport}')
+
+        use_async = transport == 'async' or (transport is None and 'FastAPIIntegration' in self._integrations)
+
+        if use_async:
+            from streply_sdk.core.async_transport import AsyncHttpTransport, is_available
+
+            if is_available():
+                return AsyncHttpTransport(self.dsn)
+
+            if transport == 'async':
+                logger.warning('httpx is not installed, falling back to HttpTransport')
+
+        return HttpTransport(self.dsn)
+
     def _setup_integration(self, integration):
         integration_name = integration.__class__.__name__
 
@@ -84,6 +194,96 @@ class Client:
         except Exception as e:
             logger.error(f'Error setting up integration {integration_name}: {e}')
 
+    def add_event_processor(
+        self,
+        func: Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]],
+        priority: int = 0,
+        name: Optional[str] = None,
+        stage: str = STAGE_GLOBAL
+    ):
+        return self.processors.add(func, priority, name, stage)
+
+    def remove_event_processor(self, processor):
+        self.processors.remove(processor)
+
+    def get_processor_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.processors.get_stats()
+
+    def add_breadcrumb(self, category=None, message=None, level='info', data=None):
+        self.context.add_breadcrumb(category=category, message=message, level=level, data=data)
+
+    @contextmanager
+    def configure_scope(self):
+        yield self.context.current_scope
+
+    @contextmanager
+    def push_scope(self):
+        with self.context.scope() as scope:
+            yield scope
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if self.aggregator is not None:
+            self.aggregator.flush()
+
+        return self.transport.flush(timeout)
+
+    async def flush_async(self, timeout: Optional[float] = None) -> bool:
+        if self.aggregator is not None:
+            self.aggregator.flush()
+
+        return await self.transport.flush_async(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        if self._closed:
+            return {'delivered': 0, 'abandoned': 0}
+
+        before = self._begin_close()
+        self.transport.close(timeout)
+
+        return self._report_close(before)
+
+    async def aclose(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        if self._closed:
+            return {'delivered': 0, 'abandoned': 0}
+
+        before = self._begin_close()
+        await self.transport.aclose(timeout)
+
+        return self._report_close(before)
+
+    def _begin_close(self) -> Dict[str, int]:
+        self._closed = True
+        atexit.unregister(self._shutdown)
+
+        if self.aggregator is not None:
+            self.aggregator.close()
+
+        return self.transport.get_delivery_stats()
+
+    def _report_close(self, before: Dict[str, int]) -> Dict[str, int]:
+        after = self.transport.get_delivery_stats()
+
+        report = {
+            'delivered': after.get('delivered', 0) - before.get('delivered', 0),
+            'abandoned': after.get('abandoned', 0) - before.get('abandoned', 0) + after.get('pending', 0),
+        }
+
+        if report['abandoned']:
+            logger.warning(
+                f'Streply shut down with {report["abandoned"]} undelivered events '
+                f'({report["delivered"]} delivered during shutdown)'
+            )
+        else:
+            logger.debug(f'Streply shut down, {report["delivered"]} events delivered during shutdown')
+
+        return report
+
+    def _shutdown(self):
+        try:
+            self.close(self.shutdown_timeout)
+        except Exception as e:
+            logger.error(f'Error shutting down Streply: {e}')
+
     def _install_global_excepthook(self):
         old_excepthook = sys.excepthook
 
@@ -105,26 +305,19 @@ class Client:
         if type_ is None:
             return
 
-        event = self._create_event(
+        event_kwargs = dict(
             type='error',
-            message=str(value),
+            message=kwargs.pop('message', None) or str(value),
             level=kwargs.pop('level', 'normal'),
             exception_name=type_.__name__,
             params=kwargs.pop('params', {}),
             **kwargs
         )
 
-        event['trace'] = get_stacktrace(traceback)
-
-        file_line_info = self._get_file_line_from_traceback(traceback)
-        if file_line_info:
-            event['file'] = file_line_info.get('file')
-            event['line'] = file_line_info.get('line')
-
-        return self._capture_event(event)
+        return self._capture(event_kwargs, traceback, type_)
 
     def capture_message(self, message, **kwargs):
-        event = self._create_event(
+        event_kwargs = dict(
             type=kwargs.pop('type', 'log'),
             message=message,
             level=kwargs.pop('level', 'normal'),
@@ -132,66 +325,289 @@ class Client:
             **kwargs
         )
 
-        return self._capture_event(event)
+        return self._capture(event_kwargs)
 
-    def _create_event(self, **kwargs):
+    def _capture(self, event_kwargs, traceback=None, exc_type=None, presampled: bool = False):
+        params = event_kwargs.get('params')
+        logger_name = params.get('logger') if params else None
+
+        if self.filters.active:
+            url = self._get_request_url() if self.filters.url_prefixes else None
+            if self.filters.should_drop(exc_type, event_kwargs.get('message'), logger_name, url):
+                return
+
+        if self.aggregator is not None and not self._aggregate_event(self._get_event_info(event_kwargs, traceback)):
+            return
+
+        if not self.sampler.should_sample(
+            event_kwargs.get('type'),
+            logger_name,
+            event_kwargs.get('exception_name'),
+            presampled
+        ):
+            return
+
+        if self._should_defer():
+            return self._send_event(DeferredEvent(self, self._snapshot_event(**event_kwargs), traceback))
+
+        event = self._create_event(**event_kwargs)
+        if traceback is not None:
+            self._add_traceback(event, traceback)
+
+        return self._send_event(event)
+
+    def _get_request_url(self):
+        scope = self.context.current_scope
+        return (scope.request or {}).get('url') or scope.url
+
+    def _should_defer(self):
+        return self.deferred_capture and getattr(self.transport, 'supports_deferred', False)
+
+    def _add_traceback(self, event, traceback):
+        event['trace'] = get_stacktrace(traceback)
+
+        file_line_info = self._get_file_line_from_traceback(traceback)
+        if file_line_info:
+            event['file'] = file_line_info.get('file')
+            event['line'] = file_line_info.get('line')
+
+    def _get_base_event(self):
+        if self._base_event is None:
+            self._base_event = {
+                'eventType': 'event',
+                'traceId': self.trace_id,
+                'traceUniqueId': None,
+                'sessionId': self.session_id,
+                'userId': None,
+                'status': 0,
+                'dateTimeZone': None,
+                'date': None,
+                'startTime': self.start_time,
+                'time': None,
+                'loadTime': None,
+                'technology': 'python',
+                'technologyVersion': platform.python_version(),
+                'environment': self.environment,
+                'release': self.release,
+                'projectId': self._extract_project_id(self.dsn),
+                'httpStatusCode': 200,
+                'apiClientVersion': '',  # __import__('streply_sdk').__version__,
+                'type': 'log',
+                'level': 'normal',
+                'params': None,
+                'message': '',
+                'requestUserAgent': None,
+                'requestParams': None,
+                'dir': '',  # TODO self.context.get('dir', None),
+                'user': None,
+                'url': None,
+                'flag': '',  # TODO self.context.get('flag', None),
+                'file': None,
+                'line': None,
+                'exceptionName': None,
+                'trace': None,
+                'breadcrumbs': None,
+                'channel': '',  # TODO self.context.get('channel', None),
+            }
+
+        return self._base_event
+
+    def _get_timezone_name(self, now: datetime.datetime) -> str:
+        timestamp = now.timestamp()
+
+        if timestamp >= self._timezone_expires:
+            self._timezone_name = str(now.astimezone().tzname())
+            self._timezone_expires = (timestamp // 3600 + 1) * 3600
+
+        return self._timezone_name
+
+    def _snapshot_event(self, **kwargs):
         self.trace_counter += 1
-        trace_unique_id = f'{self.trace_id}_{self.trace_counter}'
-
-        current_time = time.time()
-
-        event = {
-            'eventType': 'event',
-            'traceId': self.trace_id,
-            'traceUniqueId': trace_unique_id,
-            'sessionId': self.session_id,
-            'userId': self.context.user.get('userId') if self.context.user else uuid.uuid4().hex,
-            'status': 0,
-            'dateTimeZone': str(datetime.datetime.now().astimezone().tzname()),
-            'date': str(datetime.datetime.now()),
-            'startTime': self.start_time,
-            'time': current_time,
-            'loadTime': current_time - self.start_time,
-            'technology': 'python',
-            'technologyVersion': platform.python_version(),
-            'environment': self.environment,
-            'release': self.release,
-            'projectId': self._extract_project_id(self.dsn),
-            'httpStatusCode': 200,
-            'apiClientVersion': '',  # __import__('streply_sdk').__version__,
-            'type': kwargs.get('type', 'log'),
-            'level': kwargs.get('level', 'normal'),
-            'params': self._format_params(kwargs.get('params', {})),
-            'message': kwargs.get('message', ''),
-            'requestUserAgent': self.context.request.get('user_agent') if hasattr(self.context, 'request') else None,
-            'requestParams': self.context.request.get('params') if hasattr(self.context, 'request') else sys.argv,
-            'dir': '',  # TODO self.context.get('dir', None),
+
+        params = kwargs.get('params')
+        if params:
+            kwargs['params'] = dict(params)
+
+        return {
+            'counter': self.trace_counter,
+            'time': time.time(),
+            **self._snapshot_context(),
+            'kwargs': kwargs,
+        }
+
+    def _snapshot_context(self):
+        return {
             'user': self.context.user,
-            'url': self.context.request.get('url') if hasattr(self.context, 'request') else None,
-            'flag': '',  # TODO self.context.get('flag', None),
-            'file': kwargs.get('file'),
-            'line': kwargs.get('line'),
-            'exceptionName': kwargs.get('exception_name'),
-            'trace': kwargs.get('trace', []),
-            'channel': '',  # TODO self.context.get('channel', None),
+            'request': self.context.request,
+            'scope': self.context.get_event_data(),
+            'breadcrumbs': self.context.get_breadcrumbs(),
+            'processors': self.context.current_scope.event_processors,
         }
 
-        event.update(self.context.get_event_data())
+    def _build_event(self, snapshot):
+        kwargs = snapshot['kwargs']
+        user = snapshot['user']
+        request = snapshot['request']
+
+        current_time = snapshot['time']
+        now = datetime.datetime.fromtimestamp(current_time)
+
+        event = self._get_base_event().copy()
+
+        event['traceUniqueId'] = f'{self.trace_id}_{snapshot["counter"]}'
+        event['userId'] = user.get('userId') if user else uuid.uuid4().hex
+        event['dateTimeZone'] = self._get_timezone_name(now)
+        event['date'] = str(now)
+        event['time'] = current_time
+        event['loadTime'] = current_time - self.start_time
+        event['type'] = kwargs.get('type', 'log')
+        event['level'] = kwargs.get('level', 'normal')
+        event['params'] = self._format_params(kwargs.get('params', {}))
+        event['message'] = kwargs.get('message', '')
+        event['requestUserAgent'] = request.get('user_agent')
+        event['requestParams'] = request.get('params')
+        event['user'] = user
+        event['url'] = request.get('url')
+        event['file'] = kwargs.get('file')
+        event['line'] = kwargs.get('line')
+        event['exceptionName'] = kwargs.get('exception_name')
+        event['trace'] = kwargs.get('trace', [])
+
+        if snapshot['breadcrumbs']:
+            event['breadcrumbs'] = list(snapshot['breadcrumbs'])
+
+        for key, value in snapshot['scope'].items():
+            if key == 'params':
+                names = {param['name'] for param in event['params']}
+                event['params'] = event['params'] + [param for param in value if param['name'] not in names]
+            else:
+                event[key] = value
 
         return event
 
-    def _capture_event(self, event):
-        if self.sample_rate < 1.0 and random.random() > self.sample_rate:
-            return
+    def _create_event(self, **kwargs):
+        return self._build_event(self._snapshot_event(**kwargs))
 
-        if 'before_send' in self.hooks:
-            event = self.hooks['before_send'](event, {})
+    def _process_event(self, event, scope_processors=None):
+        if scope_processors is None:
+            scope_processors = self.context.current_scope.event_processors
+
+        return self.processors.process(event, {}, scope_processors)
+
+    def sample_trace(self, name: str, op: Optional[str] = None) -> bool:
+        return self.sampler.sample_trace({'name': name, 'op': op})
+
+    def start_span(self, name: str, op: Optional[str] = None) -> Span:
+        return Span(self, name, op)
+
+    def capture_transaction(self, transaction: Span):
+        params = {
+            'operation': transaction.op or 'code.execution',
+            'name': transaction.name,
+            'duration_ms': transaction.duration_ms,
+            'span_id': transaction.span_id,
+            'status': transaction.status,
+            'spans': transaction.get_spans(),
+        }
+
+        if transaction.dropped_spans:
+            params['dropped_spans'] = transaction.dropped_spans
+
+        if transaction.data:
+            params['data'] = transaction.data
+
+        event_kwargs = dict(
+            type='performance',
+            message=f'Performance: {transaction.name}',
+            level='normal',
+            params=params
+        )
+
+        return self._capture(event_kwargs, presampled=True)
+
+    def _send_event(self, event):
+        if not isinstance(event, DeferredEvent):
+            event = self._process_event(event)
 
             if event is None:
                 return
 
         return self.transport.send(event)
 
+    def _get_event_info(self, event_kwargs, traceback=None):
+        info = {
+            'type': event_kwargs.get('type', 'log'),
+            'level': event_kwargs.get('level', 'normal'),
+            'message': event_kwargs.get('message', ''),
+            'exception_name': event_kwargs.get('exception_name'),
+            'file': event_kwargs.get('file'),
+            'line': event_kwargs.get('line'),
+            'time': time.time(),
+            'params': event_kwargs.get('params'),
+            'origin': None,
+        }
+
+        if traceback is not None:
+            innermost = traceback
+            while innermost.tb_next is not None:
+                innermost = innermost.tb_next
+            info['origin'] = (innermost.tb_frame.f_code, innermost.tb_lineno)
+
+        if info['file'] is None and traceback is not None:
+            file_line_info = self._get_file_line_from_traceback(traceback)
+            if file_line_info:
+                info['file'] = file_line_info['file']
+                info['line'] = file_line_info['line']
+
+        return info
+
+    def _aggregate_event(self, info):
+        if info['type'] == 'performance':
+            return True
+
+        key = (
+            info['type'],
+            info['exception_name'],
+            info['file'],
+            info['line'],
+            info['origin'],
+            get_message_template(info['message'])
+        )
+
+        if not self.aggregator.add(key, info, info['time'], info['params']):
+            return False
+
+        info['context'] = self._snapshot_context()
+        return True
+
+    def _send_aggregate(self, aggregate):
+        info = aggregate.info
+        self.trace_counter += 1
+
+        snapshot = {
+            'counter': self.trace_counter,
+            'time': time.time(),
+            **(info.get('context') or self._snapshot_context()),
+            'kwargs': {
+                'type': info['type'],
+                'level': info['level'],
+                'message': info['message'],
+                'exception_name': info['exception_name'],
+                'file': info['file'],
+                'line': info['line'],
+                'params': {
+                    'count': aggregate.count,
+                    'first_seen': aggregate.first_seen,
+                    'last_seen': aggregate.last_seen,
+                    'sampled_params': aggregate.samples,
+                },
+            },
+        }
+
+        event = self._process_event(self._build_event(snapshot), snapshot['processors'])
+        if event is not None:
+            self.transport.send(event)
+
     def _format_params(self, params):
         formatted_params = []
 
@@ -1,36 +1,88 @@
-import copy
-import threading
+import contextvars
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from streply_sdk.core.processors import STAGE_SCOPE, EventProcessor
+
+_COPY_ON_WRITE_FIELDS = ('tags', 'extras', 'breadcrumbs')
 
 
 class Scope:
-    def __init__(self):
+    def __init__(self, max_breadcrumbs: int = 100):
         self.user = None
         self.tags = {}
         self.extras = {}
-        self.breadcrumbs = []
+        self.breadcrumbs = deque(maxlen=max_breadcrumbs)
         self.request = {}
         self.flag = None
         self.url = None
         self.channel = None
         self.dir = None
+        self.event_processors = ()
+
+        self._owned = set(_COPY_ON_WRITE_FIELDS)
+
+    def fork(self):
+        scope = Scope.__new__(Scope)
+
+        scope.user = self.user
+        scope.tags = self.tags
+        scope.extras = self.extras
+        scope.breadcrumbs = self.breadcrumbs
+        scope.request = self.request
+        scope.flag = self.flag
+        scope.url = self.url
+        scope.channel = self.channel
+        scope.dir = self.dir
+        scope.event_processors = self.event_processors
+
+        scope._owned = set()
+        self._owned.clear()
+
+        return scope
+
+    def _own(self, field):
+        if field in self._owned:
+            return
+
+        value = getattr(self, field)
+        if isinstance(value, deque):
+            setattr(self, field, deque(value, value.maxlen))
+        else:
+            setattr(self, field, dict(value))
+        self._owned.add(field)
 
     def set_user(self, user):
         self.user = user
 
     def set_tag(self, key, value):
+        self._own('tags')
         self.tags[key] = value
 
     def set_extra(self, key, value):
+        self._own('extras')
         self.extras[key] = value
 
     def add_breadcrumb(self, category, message, level, data=None):
+        self._own('breadcrumbs')
         self.breadcrumbs.append({
+            'timestamp': time.time(),
             'category': category,
             'message': message,
             'level': level,
             'data': data or {}
         })
 
+    def add_event_processor(self, func, priority=0, name=None):
+        processor = EventProcessor(func, priority, name, STAGE_SCOPE)
+        self.event_processors = tuple(sorted(self.event_processors + (processor,), key=EventProcessor.sort_key))
+        return processor
+
+    def share_breadcrumbs(self):
+        self._owned.discard('breadcrumbs')
+        return self.breadcrumbs
+
     def set_request_data(self, data):
         self.request = data
 
@@ -82,60 +134,77 @@ class Scope:
         self.user = None
         self.tags = {}
         self.extras = {}
-        self.breadcrumbs = []
+        self.breadcrumbs = deque(maxlen=self.breadcrumbs.maxlen)
         self.request = {}
         self.flag = None
         self.url = None
         self.channel = None
         self.dir = None
+        self.event_processors = ()
+
+        self._owned = set(_COPY_ON_WRITE_FIELDS)
 
 
 class Context:
-    def __init__(self):
-        self._global_scope = Scope()
-        self._scopes = []
-        self._stack = threading.local()
+    def __init__(self, max_breadcrumbs: int = 100):
+        self._global_scope = Scope(max_breadcrumbs)
+        self._stack = contextvars.ContextVar(f'streply_scope_stack_{id(self)}', default=None)
 
     @property
     def current_scope(self):
-        if not hasattr(self._stack, 'stack'):
-            self._stack.stack = []
+        node = self._stack.get()
 
-        if not self._stack.stack:
+        if node is None:
             return self._global_scope
 
-        return self._stack.stack[-1]
+        return node[0]
 
     def push_scope(self):
-        if not hasattr(self._stack, 'stack'):
-            self._stack.stack = []
-
-        scope = Scope()
-
-        scope.user = copy.deepcopy(self._global_scope.user)
-        scope.tags = copy.deepcopy(self._global_scope.tags)
-        scope.extras = copy.deepcopy(self._global_scope.extras)
-        scope.breadcrumbs = copy.deepcopy(self._global_scope.breadcrumbs)
-        scope.request = copy.deepcopy(self._global_scope.request)
-        scope.flag = self._global_scope.flag
-        scope.url = self._global_scope.url
-        scope.channel = self._global_scope.channel
-        scope.dir = self._global_scope.dir
-
-        self._stack.stack.append(scope)
-        return scope
+        node = self._stack.get()
+        parent = self._global_scope if node is None else node[0]
 
-    def pop_scope(self):
-        if not hasattr(self._stack, 'stack'):
-            return
+        scope = parent.fork()
+        self._stack.set((scope, node))
+        return scope
 
-        if self._stack.stack:
-            self._stack.stack.pop()
+    def pop_scope(self, scope=None):
+        node = self._stack.get()
+
+        if node is not None and (scope is None or node[0] is scope):
+            self._stack.set(node[1])
+
+    @contextmanager
+    def scope(self):
+        node = self._stack.get()
+        parent = self._global_scope if node is None else node[0]
+
+        scope = parent.fork()
+        token = self._stack.set((scope, node))
+
+        try:
+            yield scope
+        finally:
+            try:
+                self._stack.reset(token)
+            except ValueError:
+                self._stack.set(node)
+
+    @contextmanager
+    def use_scope(self, scope):
+        node = self._stack.get()
+        token = self._stack.set((scope, node))
+
+        try:
+            yield scope
+        finally:
+            try:
+                self._stack.reset(token)
+            except ValueError:
+                self._stack.set(node)
 
     def clear_all(self):
         self._global_scope.clear()
-        if hasattr(self._stack, 'stack'):
-            self._stack.stack = []
+        self._stack.set(None)
 
     def set_user(self, user):
         self.current_scope.set_user(user)
@@ -158,6 +227,12 @@ class Context:
     def get_event_data(self):
         return self.current_scope.get_event_data()
 
+    def add_event_processor(self, func, priority=0, name=None):
+        return self.current_scope.add_event_processor(func, priority, name)
+
+    def get_breadcrumbs(self):
+        return self.current_scope.share_breadcrumbs()
+
     @property
     def user(self):
         return self.current_scope.user
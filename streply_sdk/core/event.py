@@ -4,7 +4,7 @@ import platform
 import sys
 import os
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 class Event:
@@ -88,3 +88,22 @@ class Event:
             })
 
         return formatted_params
+
+
+class DeferredEvent:
+    def __init__(self, client, snapshot: Dict[str, Any], traceback=None):
+        self.client = client
+        self.snapshot = snapshot
+        self.traceback = traceback
+
+    def get(self, key: str, default=None):
+        return self.snapshot['kwargs'].get(key, default)
+
+    def materialize(self) -> Optional[Dict[str, Any]]:
+        event = self.client._build_event(self.snapshot)
+
+        if self.traceback is not None:
+            self.client._add_traceback(event, self.traceback)
+            self.traceback = None
+
+        return self.client._process_event(event, self.snapshot['processors'])
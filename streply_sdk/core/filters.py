@@ -0,0 +1,104 @@
+import re
+from typing import Dict, Iterable, Optional, Union
+
+MAX_CACHED_NAMES = 10000
+
+
+class EventFilter:
+    def __init__(
+        self,
+        ignore_exceptions: Optional[Iterable[Union[type, str]]] = None,
+        ignore_loggers: Optional[Iterable[str]] = None,
+        ignore_messages: Optional[Iterable[Union[str, 're.Pattern']]] = None,
+        ignore_urls: Optional[Iterable[str]] = None
+    ):
+        ignore_exceptions = list(ignore_exceptions or ())
+
+        self.exception_types = tuple(item for item in ignore_exceptions if isinstance(item, type))
+        self.exception_names = frozenset(item for item in ignore_exceptions if isinstance(item, str))
+        self.logger_names = frozenset(ignore_loggers or ())
+        self.message_patterns = [
+            pattern if isinstance(pattern, re.Pattern) else re.compile(pattern)
+            for pattern in ignore_messages or ()
+        ]
+        self.url_prefixes = tuple(ignore_urls or ())
+
+        self._exception_cache = {}
+        self._logger_cache = {}
+        self._drop_counts = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(
+            self.exception_types or self.exception_names or self.logger_names
+            or self.message_patterns or self.url_prefixes
+        )
+
+    def _is_ignored_exception(self, exc_type: type) -> bool:
+        try:
+            return self._exception_cache[exc_type]
+        except KeyError:
+            pass
+
+        ignored = bool(self.exception_types) and issubclass(exc_type, self.exception_types)
+
+        if not ignored and self.exception_names:
+            for cls in exc_type.__mro__:
+                if cls.__name__ in self.exception_names or f'{cls.__module__}.{cls.__qualname__}' in self.exception_names:
+                    ignored = True
+                    break
+
+        if len(self._exception_cache) < MAX_CACHED_NAMES:
+            self._exception_cache[exc_type] = ignored
+
+        return ignored
+
+    def _is_ignored_logger(self, name: str) -> bool:
+        try:
+            return self._logger_cache[name]
+        except KeyError:
+            pass
+
+        ignored = False
+        prefix = name
+        while prefix:
+            if prefix in self.logger_names:
+                ignored = True
+                break
+            prefix = prefix.rpartition('.')[0]
+
+        if len(self._logger_cache) < MAX_CACHED_NAMES:
+            self._logger_cache[name] = ignored
+
+        return ignored
+
+    def _record_drop(self, reason: str) -> str:
+        self._drop_counts[reason] = self._drop_counts.get(reason, 0) + 1
+        return reason
+
+    def should_drop(
+        self,
+        exc_type: Optional[type] = None,
+        message: Optional[str] = None,
+        logger_name: Optional[str] = None,
+        url: Optional[str] = None
+    ) -> Optional[str]:
+        if exc_type is not None and (self.exception_types or self.exception_names):
+            if self._is_ignored_exception(exc_type):
+                return self._record_drop('exception')
+
+        if logger_name and self.logger_names and self._is_ignored_logger(logger_name):
+            return self._record_drop('logger')
+
+        if url and self.url_prefixes and url.startswith(self.url_prefixes):
+            return self._record_drop('url')
+
+        if message and self.message_patterns:
+            for pattern in self.message_patterns:
+                if pattern.search(message):
+                    return self._record_drop('message')
+
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._drop_counts)
@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGE_SCOPE = 'scope'
+STAGE_GLOBAL = 'global'
+STAGE_INTEGRATION = 'integration'
+STAGES = (STAGE_SCOPE, STAGE_GLOBAL, STAGE_INTEGRATION)
+
+PRIORITY_ENVIRONMENT = 100
+PRIORITY_SCRUB = 900
+PRIORITY_BEFORE_SEND = 1000
+
+_sequence = itertools.count()
+
+
+class EventProcessor:
+    __slots__ = ('func', 'priority', 'name', 'stage', 'seq')
+
+    def __init__(self, func: Callable, priority: int = 0, name: Optional[str] = None, stage: str = STAGE_GLOBAL):
+        if stage not in STAGES:
+            raise ValueError(f'Unknown event processor stage: {stage}')
+
+        self.func = func
+        self.priority = priority
+        self.name = name or getattr(func, '__qualname__', None) or repr(func)
+        self.stage = stage
+        self.seq = next(_sequence)
+
+    def sort_key(self):
+        return self.priority, self.seq
+
+
+class ProcessorPipeline:
+    def __init__(self):
+        self._processors = ()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        func: Callable,
+        priority: int = 0,
+        name: Optional[str] = None,
+        stage: str = STAGE_GLOBAL
+    ) -> EventProcessor:
+        processor = EventProcessor(func, priority, name, stage)
+
+        with self._lock:
+            self._processors = tuple(sorted(self._processors + (processor,), key=EventProcessor.sort_key))
+
+        return processor
+
+    def remove(self, processor):
+        with self._lock:
+            self._processors = tuple(
+                p for p in self._processors
+                if p is not processor and p.name != processor and p.func is not processor
+            )
+
+    def _get_stats(self, processor: EventProcessor):
+        key = (processor.stage, processor.name)
+        stats = self._stats.get(key)
+
+        if stats is None:
+            stats = self._stats.setdefault(key, [0, 0, 0, 0])
+
+        return stats
+
+    def process(
+        self,
+        event: Dict[str, Any],
+        hint: Optional[Dict[str, Any]] = None,
+        scope_processors: Iterable[EventProcessor] = ()
+    ) -> Optional[Dict[str, Any]]:
+        if hint is None:
+            hint = {}
+
+        processors = self._processors
+        if scope_processors:
+            processors = heapq.merge(processors, scope_processors, key=EventProcessor.sort_key)
+
+        for processor in processors:
+            stats = self._get_stats(processor)
+            start = time.perf_counter_ns()
+
+            try:
+                result = processor.func(event, hint)
+            except Exception as e:
+                logger.error(f'Error in event processor {processor.name}: {e}')
+                stats[2] += 1
+                result = event
+
+            stats[0] += 1
+            stats[3] += time.perf_counter_ns() - start
+
+            if result is None:
+                stats[1] += 1
+                logger.debug(f'Event dropped by processor {processor.name}')
+                return None
+
+            event = result
+
+        return event
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f'{stage}:{name}': {
+                'calls': calls,
+                'drops': drops,
+                'errors': errors,
+                'total_ms': total_ns / 1e6,
+                'avg_us': total_ns / calls / 1e3 if calls else 0.0,
+            }
+            for (stage, name), (calls, drops, errors, total_ns) in list(self._stats.items())
+        }
@@ -0,0 +1,177 @@
+import datetime
+import email.utils
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if retry_at is None:
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class PendingDelivery:
+    def __init__(self, data, headers, encoded_events: List[bytes], batch: bool, attempt: int = 0):
+        self.data = data
+        self.headers = headers
+        self.encoded_events = encoded_events
+        self.batch = batch
+        self.attempt = attempt
+
+    @property
+    def count(self) -> int:
+        return len(self.encoded_events)
+
+
+class RetryScheduler:
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 30.0, max_pending: int = 10000):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def schedule(self, delay: float, item: PendingDelivery) -> bool:
+        with self._lock:
+            if self._pending + item.count > self.max_pending:
+                return False
+
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+            self._pending += item.count
+            return True
+
+    def pop_due(self) -> List[Any]:
+        now = time.monotonic()
+        due = []
+
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                item = heapq.heappop(self._heap)[2]
+                self._pending -= item.count
+                due.append(item)
+
+        return due
+
+    def pop_all(self) -> List[Any]:
+        with self._lock:
+            items = [entry[2] for entry in sorted(self._heap)]
+            self._heap = []
+            self._pending = 0
+
+        return items
+
+    def next_due_in(self) -> Optional[float]:
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._probe_in_flight:
+                return False
+
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info('Streply endpoint recovered, closing circuit breaker')
+
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state == self.CLOSED:
+                    logger.warning(
+                        f'Streply endpoint failing, pausing delivery for {self.recovery_timeout}s'
+                    )
+                else:
+                    logger.debug('Streply endpoint probe failed, keeping circuit breaker open')
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
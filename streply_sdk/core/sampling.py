@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('error', 'log', 'performance')
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: float = 1.0, reserve: float = 0.0) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens - reserve < tokens:
+                return False
+
+            self._tokens -= tokens
+            return True
+
+
+class Sampler:
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        traces_sample_rate: float = 1.0,
+        sample_rates: Optional[Dict[str, float]] = None,
+        logger_sample_rates: Optional[Dict[str, float]] = None,
+        exception_sample_rates: Optional[Dict[str, float]] = None,
+        traces_sampler: Optional[Callable[[Dict[str, Any]], Union[float, bool]]] = None,
+        max_events_per_second: Optional[float] = None,
+        error_budget_share: float = 0.2
+    ):
+        self.type_rates = {
+            'error': sample_rate,
+            'log': sample_rate,
+            'performance': traces_sample_rate,
+        }
+        self.type_rates.update(sample_rates or {})
+
+        self.default_rate = sample_rate
+        self.traces_sample_rate = traces_sample_rate
+        self.logger_rates = dict(logger_sample_rates or {})
+        self.exception_rates = dict(exception_sample_rates or {})
+        self.traces_sampler = traces_sampler
+
+        self.budget = TokenBucket(max_events_per_second) if max_events_per_second else None
+        self.error_reserve = self.budget.burst * error_budget_share if self.budget is not None else 0.0
+
+        self._logger_rate_cache = {}
+        self._drop_counts = {}
+
+    def _get_logger_rate(self, name: str) -> Optional[float]:
+        try:
+            return self._logger_rate_cache[name]
+        except KeyError:
+            pass
+
+        rate = None
+        prefix = name
+        while prefix:
+            if prefix in self.logger_rates:
+                rate = self.logger_rates[prefix]
+                break
+            prefix = prefix.rpartition('.')[0]
+
+        if len(self._logger_rate_cache) < 10000:
+            self._logger_rate_cache[name] = rate
+
+        return rate
+
+    def get_rate(
+        self,
+        event_type: Optional[str],
+        logger_name: Optional[str] = None,
+        exception_name: Optional[str] = None
+    ) -> float:
+        if exception_name and exception_name in self.exception_rates:
+            return self.exception_rates[exception_name]
+
+        if logger_name and self.logger_rates:
+            rate = self._get_logger_rate(logger_name)
+            if rate is not None:
+                return rate
+
+        return self.type_rates.get(event_type, self.default_rate)
+
+    def _record_drop(self, reason: str):
+        self._drop_counts[reason] = self._drop_counts.get(reason, 0) + 1
+
+    def _check_budget(self, event_type: Optional[str]) -> bool:
+        if self.budget is None:
+            return True
+
+        reserve = 0.0 if event_type == 'error' else self.error_reserve
+        if not self.budget.consume(reserve=reserve):
+            self._record_drop('rate_limited')
+            return False
+
+        return True
+
+    def should_sample(
+        self,
+        event_type: Optional[str],
+        logger_name: Optional[str] = None,
+        exception_name: Optional[str] = None,
+        presampled: bool = False
+    ) -> bool:
+        if not presampled:
+            rate = self.get_rate(event_type, logger_name, exception_name)
+
+            if rate < 1.0 and (rate <= 0.0 or random.random() >= rate):
+                self._record_drop('sampled')
+                return False
+
+        return self._check_budget(event_type)
+
+    def sample_trace(self, sampling_context: Dict[str, Any]) -> bool:
+        rate = self.type_rates['performance']
+
+        if self.traces_sampler is not None:
+            try:
+                rate = float(self.traces_sampler(sampling_context))
+            except Exception as e:
+                logger.error(f'Error in traces_sampler: {e}')
+
+        if rate < 1.0 and (rate <= 0.0 or random.random() >= rate):
+            self._record_drop('sampled')
+            return False
+
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._drop_counts)
@@ -0,0 +1,288 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.spool'
+
+
+class DiskSpool:
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 50 * 1024 * 1024,
+        segment_max_bytes: int = 5 * 1024 * 1024,
+        fsync_every: int = 100,
+        fsync_interval: float = 1.0,
+        replay_rate: float = 100.0,
+        replay_interval: float = 30.0,
+        replay_chunk_size: int = 100,
+        on_drop: Optional[Callable[[str, int], None]] = None
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.replay_rate = replay_rate
+        self.replay_interval = replay_interval
+        self.replay_chunk_size = replay_chunk_size
+        self.on_drop = on_drop
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_path = None
+        self._file_size = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._pid = os.getpid()
+        self._instance_id = uuid.uuid4().hex[:8]
+        self._next_seq = 0
+        self._offsets = {}
+
+        self._replay_thread = None
+        self._replay_wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def _segment_paths(self) -> List[str]:
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+        except OSError as e:
+            logger.error(f'Error listing Streply spool directory: {e}')
+            return []
+
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _lock_file(self, f) -> bool:
+        if fcntl is None:
+            return True
+
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _open_locked(self, path: str):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            if self._lock_file(f) and os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                return f
+        except OSError:
+            pass
+
+        f.close()
+        return None
+
+    def _check_fork(self):
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+
+        self._pid = pid
+        self._offsets = {}
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_path = None
+            self._file_size = 0
+            self._unsynced = 0
+
+    def _open_segment(self):
+        name = f'{time.time_ns():020d}-{self._pid}-{self._instance_id}-{self._next_seq:06d}{SEGMENT_SUFFIX}'
+        self._file_path = os.path.join(self.directory, name)
+        self._next_seq += 1
+        self._file = open(self._file_path, 'ab', buffering=0)
+        self._lock_file(self._file)
+        self._file_size = 0
+
+    def _sync(self):
+        if self._file is None or not self._unsynced:
+            return
+
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def _rotate(self):
+        if self._file is None:
+            return
+
+        self._sync()
+        self._file.close()
+        self._file = None
+        self._file_path = None
+        self._file_size = 0
+
+        self._enforce_max_bytes()
+
+    def _enforce_max_bytes(self):
+        paths = self._segment_paths()
+        sizes = {}
+        for path in paths:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+
+        total = sum(sizes.values())
+
+        for path in paths:
+            if total <= self.max_bytes or path == self._file_path:
+                break
+
+            f = self._open_locked(path)
+            if f is None:
+                continue
+
+            try:
+                with f:
+                    dropped = f.read().count(b'\n') - self._offsets.pop(path, 0)
+                    os.remove(path)
+            except OSError as e:
+                logger.error(f'Error removing Streply spool segment {path}: {e}')
+                continue
+
+            total -= sizes[path]
+            logger.warning(f'Streply spool is full, dropped {dropped} events')
+            if self.on_drop is not None:
+                self.on_drop('spool_full', dropped)
+
+    def append(self, encoded_events: List[bytes]):
+        if not encoded_events:
+            return
+
+        with self._lock:
+            try:
+                self._check_fork()
+
+                if self._file is None:
+                    self._open_segment()
+
+                data = b''.join(event + b'\n' for event in encoded_events)
+                self._file.write(data)
+                self._file_size += len(data)
+                self._unsynced += len(encoded_events)
+
+                if (
+                    self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_fsync >= self.fsync_interval
+                ):
+                    self._sync()
+
+                if self._file_size >= self.segment_max_bytes:
+                    self._rotate()
+            except OSError as e:
+                logger.error(f'Error writing to Streply spool: {e}')
+                if self.on_drop is not None:
+                    self.on_drop('spool_error', len(encoded_events))
+
+    def pending_segments(self) -> List[str]:
+        with self._lock:
+            self._check_fork()
+
+            if self._file is not None and self._file_size:
+                self._rotate()
+
+            return [path for path in self._segment_paths() if path != self._file_path]
+
+    def replay(self, send: Callable[[List[bytes]], bool]) -> bool:
+        for path in self.pending_segments():
+            if self._stopped.is_set():
+                return False
+
+            f = self._open_locked(path)
+            if f is None:
+                continue
+
+            with f:
+                if not self._replay_segment(f, path, send):
+                    return False
+
+                with self._lock:
+                    self._offsets.pop(path, None)
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.error(f'Error removing Streply spool segment {path}: {e}')
+
+        return True
+
+    def _replay_segment(self, f, path: str, send: Callable[[List[bytes]], bool]) -> bool:
+        try:
+            lines = [line for line in f.read().split(b'\n') if line]
+        except OSError as e:
+            logger.error(f'Error reading Streply spool segment {path}: {e}')
+            return False
+
+        offset = self._offsets.get(path, 0)
+
+        while offset < len(lines):
+            chunk = lines[offset:offset + self.replay_chunk_size]
+
+            if not send(chunk):
+                return False
+
+            offset += len(chunk)
+            self._offsets[path] = offset
+
+            if self.replay_rate and self._stopped.wait(len(chunk) / self.replay_rate):
+                return False
+
+        logger.debug(f'Replayed {len(lines)} events from Streply spool')
+        return True
+
+    def start_replay(self, send: Callable[[List[bytes]], bool]):
+        if self._replay_thread is not None and self._replay_thread.is_alive():
+            return
+
+        self._replay_thread = threading.Thread(
+            target=self._replay_loop,
+            args=(send,),
+            name='streply-spool',
+            daemon=True
+        )
+        self._replay_thread.start()
+
+    def wakeup(self):
+        self._replay_wakeup.set()
+
+    def _replay_loop(self, send: Callable[[List[bytes]], bool]):
+        while not self._stopped.is_set():
+            try:
+                self.replay(send)
+            except Exception as e:
+                logger.error(f'Unexpected error replaying Streply spool: {e}')
+
+            self._replay_wakeup.wait(self.replay_interval)
+            self._replay_wakeup.clear()
+
+    def close(self):
+        self._stopped.set()
+        self._replay_wakeup.set()
+
+        with self._lock:
+            try:
+                self._sync()
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                    self._file_path = None
+            except OSError as e:
+                logger.error(f'Error closing Streply spool: {e}')
@@ -0,0 +1,169 @@
+import contextvars
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar('streply_current_span', default=None)
+
+
+def get_current_span() -> Optional['Span']:
+    return _current_span.get()
+
+
+def _new_span_id() -> str:
+    return f'{random.getrandbits(64):016x}'
+
+
+class Span:
+    def __init__(self, client, name: str, op: Optional[str] = None):
+        self.client = client
+        self.name = name
+        self.op = op
+
+        self.span_id = None
+        self.parent = None
+        self.transaction = None
+        self.sampled = True
+        self.status = 'ok'
+        self.data = {}
+
+        self.start_time = None
+        self.start_ns = None
+        self.end_ns = None
+        self.paused_ns = 0
+        self._suspended_at = None
+
+        self.spans = None
+        self.dropped_spans = 0
+        self.max_spans = 0
+
+        self._token = None
+
+    @property
+    def is_transaction(self) -> bool:
+        return self.transaction is self
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.start_ns is None or self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns - self.paused_ns) / 1e6
+
+    def set_data(self, key: str, value: Any):
+        self.data[key] = value
+
+    def set_status(self, status: str):
+        self.status = status
+
+    def start(self) -> 'Span':
+        parent = _current_span.get()
+
+        if parent is not None and not parent.sampled:
+            self.sampled = False
+            self.transaction = parent.transaction
+            return self
+
+        if parent is None:
+            self.transaction = self
+            self.sampled = self.client.sample_trace(self.name, self.op)
+
+            if not self.sampled:
+                self._token = _current_span.set(self)
+                return self
+
+            self.spans = []
+            self.max_spans = self.client.max_spans
+            self.start_time = time.time()
+        else:
+            self.parent = parent
+            self.transaction = parent.transaction
+
+        self.span_id = _new_span_id()
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+
+        return self
+
+    def _reset_current(self):
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            _current_span.set(self.parent)
+        self._token = None
+
+    def suspend(self):
+        if self._token is None:
+            return
+
+        self._reset_current()
+        self._suspended_at = time.perf_counter_ns()
+
+    def resume(self):
+        if self._suspended_at is None:
+            return
+
+        self.paused_ns += time.perf_counter_ns() - self._suspended_at
+        self._suspended_at = None
+        self._token = _current_span.set(self)
+
+    def finish(self):
+        if self.end_ns is not None:
+            return
+
+        self.resume()
+        self.end_ns = time.perf_counter_ns()
+
+        if self._token is not None:
+            self._reset_current()
+
+        if not self.sampled:
+            return
+
+        transaction = self.transaction
+
+        if transaction is self:
+            self.client.capture_transaction(self)
+        elif transaction.end_ns is None:
+            if len(transaction.spans) < transaction.max_spans:
+                transaction.spans.append(self)
+            else:
+                transaction.dropped_spans += 1
+
+    def __enter__(self) -> 'Span':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.status = 'error'
+        self.finish()
+
+    async def __aenter__(self) -> 'Span':
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.__exit__(exc_type, exc_value, traceback)
+
+    def to_dict(self, transaction_start_ns: int) -> Dict[str, Any]:
+        data = {
+            'span_id': self.span_id,
+            'parent_id': self.parent.span_id if self.parent is not None else None,
+            'name': self.name,
+            'op': self.op,
+            'status': self.status,
+            'start_ms': (self.start_ns - transaction_start_ns) / 1e6,
+            'duration_ms': self.duration_ms,
+        }
+
+        if self.data:
+            data['data'] = self.data
+
+        return data
+
+    def get_spans(self) -> List[Dict[str, Any]]:
+        if not self.spans:
+            return []
+
+        return [span.to_dict(self.start_ns) for span in sorted(self.spans, key=lambda span: span.start_ns)]
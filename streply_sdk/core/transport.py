@@ -1,130 +1,760 @@
-import json
+import asyncio
 import logging
+import random
 import threading
 import time
 import urllib.parse
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import Dict, Any, Optional, List
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from streply_sdk.core.event import DeferredEvent
+from streply_sdk.core.retry import CircuitBreaker, PendingDelivery, RetryScheduler, parse_retry_after
+from streply_sdk.core.spool import DiskSpool
+from streply_sdk.utils.encoding import (
+    ENCODING_GZIP, ENCODING_NONE, ENCODING_ZSTD, compress, dumps, negotiate_encoding, zstd_available
+)
 
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_SAMPLE = 'sample'
+
+OVERFLOW_POLICIES = (OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST, OVERFLOW_SAMPLE)
+
+RETRYABLE_STATUS_CODES = (408, 429)
+
+COMPRESSION_AUTO = 'auto'
+COMPRESSION_MODES = (COMPRESSION_AUTO, ENCODING_GZIP, ENCODING_ZSTD, ENCODING_NONE)
+
 
 class Transport:
+    supports_deferred = False
+
     def __init__(self, dsn: str):
         self.dsn = dsn
         self.last_event_id = None
 
+    def _materialize(self, event) -> Optional[Dict[str, Any]]:
+        if not isinstance(event, DeferredEvent):
+            return event
+
+        try:
+            return event.materialize()
+        except Exception as e:
+            logger.error(f'Error building Streply event: {e}')
+            return None
+
     def send(self, event: Dict[str, Any]) -> Optional[str]:
         raise NotImplementedError('Transport.send musi być zaimplementowane')
 
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        return self.flush(timeout)
+
+    async def flush_async(self, timeout: Optional[float] = None) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush, timeout)
+
+    async def aclose(self, timeout: Optional[float] = None) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, self.close, timeout)
+
+    def get_delivery_stats(self) -> Dict[str, int]:
+        return {'delivered': 0, 'pending': 0, 'spooled': 0, 'abandoned': 0}
+
 
 class HttpTransport(Transport):
+    supports_deferred = True
+
     def __init__(
         self,
         dsn: str,
         timeout: float = 2.0,
         buffer_size: int = 100,
         retry_max: int = 3,
-        retry_delay: float = 0.5
+        retry_delay: float = 0.5,
+        batch: bool = False,
+        batch_max_events: Optional[int] = None,
+        batch_max_bytes: int = 1024 * 1024,
+        batch_linger: float = 0.05,
+        compression: str = COMPRESSION_AUTO,
+        compression_threshold: int = 1024,
+        compression_level: Optional[int] = None,
+        pool_size: int = 4,
+        pool_keep_alive: bool = True,
+        pool_idle_timeout: Optional[float] = 60.0,
+        queue_size: int = 10000,
+        overflow_policy: str = OVERFLOW_DROP_NEWEST,
+        queue_high_water: float = 0.5,
+        spool_dir: Optional[str] = None,
+        spool_max_bytes: int = 50 * 1024 * 1024,
+        spool_replay_rate: float = 100.0,
+        spool_replay_interval: float = 30.0,
+        retry_max_delay: float = 30.0,
+        retry_max_pending: int = 10000,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_timeout: float = 30.0,
+        workers: int = 1,
+        max_in_flight: Optional[int] = None
     ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {overflow_policy}')
+
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f'Unknown compression: {compression}')
+
+        if compression == ENCODING_ZSTD and not zstd_available():
+            logger.warning('zstandard is not installed, falling back to gzip compression')
+            compression = ENCODING_GZIP
+
         super().__init__(dsn)
         self.timeout = timeout
         self.buffer_size = buffer_size
+        self.workers = max(1, workers)
+        self.max_in_flight = max_in_flight or (buffer_size if batch else 1)
         self.retry_max = retry_max
         self.retry_delay = retry_delay
+        self.batch = batch
+        self.batch_max_events = batch_max_events or buffer_size
+        self.batch_max_bytes = batch_max_bytes
+        self.batch_linger = batch_linger
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self._server_encoding = ENCODING_NONE
+        self.pool_size = pool_size
+        self.pool_keep_alive = pool_keep_alive
+        self.pool_idle_timeout = pool_idle_timeout
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.queue_high_water = queue_high_water
 
         parsed = urllib.parse.urlparse(dsn)
         self.public_key = parsed.username
         self.project_id = parsed.path.strip('/')
         self.api_url = f'{parsed.scheme}://{parsed.netloc}'
 
-        self._buffer = []
+        self._session = None
+        self._adapter = None
+        self._session_lock = threading.Lock()
+        self._session_last_used = 0.0
+        self._retired_stats = {'requests': 0, 'connections': 0}
+
+        self._buffer = deque()
         self._buffer_lock = threading.RLock()
-        self._worker = None
-        self._worker_thread = None
+        self._buffer_not_empty = threading.Condition(self._buffer_lock)
+        self._all_done = threading.Condition(self._buffer_lock)
+        self._unfinished = 0
+        self._drop_counts = {}
+        self._delivery_stats = {'delivered': 0, 'spooled': 0, 'abandoned': 0}
+        self._worker_threads = []
         self._running = False
+        self._closed = False
 
-        self._start_worker()
+        self._retry = RetryScheduler(
+            base_delay=retry_delay,
+            max_delay=retry_max_delay,
+            max_pending=retry_max_pending
+        )
+        self._breaker = CircuitBreaker(
+            failure_threshold=breaker_failure_threshold,
+            recovery_timeout=breaker_recovery_timeout
+        )
 
-    def _start_worker(self):
-        if self._running:
-            return
+        self._spool = None
+        self._delivery_failed = False
+        if spool_dir:
+            self._spool = DiskSpool(
+                spool_dir,
+                max_bytes=spool_max_bytes,
+                replay_rate=spool_replay_rate,
+                replay_interval=spool_replay_interval,
+                on_drop=self._record_drop
+            )
+            self._spool.start_replay(self._replay)
+
+        self._start_workers()
 
-        self._running = True
-        self._worker_thread = threading.Thread(
-            target=self._worker_loop,
-            name='streply-worker',
-            daemon=True
+    def _start_workers(self):
+        with self._buffer_lock:
+            if self._closed:
+                return
+
+            self._running = True
+            self._worker_threads = [thread for thread in self._worker_threads if thread.is_alive()]
+
+            for index in range(len(self._worker_threads), self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f'streply-worker-{index}' if self.workers > 1 else 'streply-worker',
+                    daemon=True
+                )
+                thread.start()
+                self._worker_threads.append(thread)
+
+    def _workers_alive(self) -> bool:
+        return self._running and all(thread.is_alive() for thread in self._worker_threads)
+
+    def _get_session(self) -> requests.Session:
+        with self._session_lock:
+            now = time.monotonic()
+
+            if (
+                self._session is not None
+                and self.pool_idle_timeout is not None
+                and now - self._session_last_used > self.pool_idle_timeout
+            ):
+                logger.debug('Closing idle Streply connection pool')
+                self._close_session()
+
+            if self._session is None:
+                self._session = self._create_session()
+
+            self._session_last_used = now
+            return self._session
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+
+        self._adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(self.pool_size, self.workers),
+            max_retries=0
         )
-        self._worker_thread.start()
+        session.mount('https://', self._adapter)
+        session.mount('http://', self._adapter)
+
+        session.headers['Connection'] = 'keep-alive' if self.pool_keep_alive else 'close'
+
+        return session
+
+    def _close_session(self):
+        stats = self._pool_stats()
+        self._retired_stats['requests'] += stats['requests']
+        self._retired_stats['connections'] += stats['connections']
+
+        try:
+            self._session.close()
+        except Exception as e:
+            logger.debug(f'Error closing Streply session: {e}')
+
+        self._session = None
+        self._adapter = None
+
+    def _pool_stats(self) -> Dict[str, int]:
+        stats = {'requests': 0, 'connections': 0}
+
+        if self._adapter is None:
+            return stats
+
+        try:
+            pools = self._adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats['requests'] += pool.num_requests
+                stats['connections'] += pool.num_connections
+        except Exception as e:
+            logger.debug(f'Error reading Streply pool stats: {e}')
+
+        return stats
+
+    def get_connection_stats(self) -> Dict[str, int]:
+        with self._session_lock:
+            stats = self._pool_stats()
+
+        requests_count = stats['requests'] + self._retired_stats['requests']
+        connections = stats['connections'] + self._retired_stats['connections']
+
+        return {
+            'requests': requests_count,
+            'connections': connections,
+            'reused': max(0, requests_count - connections),
+        }
+
+    @property
+    def connections_reused(self) -> int:
+        return self.get_connection_stats()['reused']
 
     def _worker_loop(self):
         while self._running:
-            if not self._buffer:
-                time.sleep(0.1)
-                continue
-
             with self._buffer_lock:
-                events = self._buffer[:self.buffer_size]
-                self._buffer = self._buffer[self.buffer_size:]
+                due = self._wait_for_work()
+                if not self._running:
+                    return
+
+                events = []
+                if self._buffer and not self._breaker.is_open():
+                    if self.batch:
+                        self._wait_for_batch()
+
+                    events = [self._buffer.popleft() for _ in range(min(self.max_in_flight, len(self._buffer)))]
+
+                    if self._buffer and self.workers > 1:
+                        self._buffer_not_empty.notify()
+
+            for item in due:
+                try:
+                    self._complete(item, self._deliver(item))
+                except Exception as e:
+                    logger.error(f'Unexpected error in Streply worker: {e}')
+                finally:
+                    self._task_done(item.count)
+
+            if self.batch and events:
+                self._send_batches(events)
+                continue
 
             for event in events:
-                self._send_event(event)
+                try:
+                    self._send_event(event)
+                except Exception as e:
+                    logger.error(f'Unexpected error in Streply worker: {e}')
+                finally:
+                    self._task_done(1)
+
+    def _wait_for_work(self) -> List[PendingDelivery]:
+        while self._running:
+            due = self._retry.pop_due()
+            if due or (self._buffer and not self._breaker.is_open()):
+                return due
+
+            self._buffer_not_empty.wait(self._next_wakeup())
+
+        return []
+
+    def _next_wakeup(self) -> Optional[float]:
+        timeouts = [self._retry.next_due_in()]
+        if self._buffer:
+            timeouts.append(self._breaker.retry_in())
+
+        timeouts = [timeout for timeout in timeouts if timeout is not None]
+        return min(timeouts) if timeouts else None
+
+    def _wait_for_batch(self):
+        deadline = time.monotonic() + self.batch_linger
+
+        while self._running and len(self._buffer) < self.batch_max_events:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._buffer_not_empty.wait(remaining)
+
+    def _add_unfinished(self, count: int):
+        with self._buffer_lock:
+            self._unfinished += count
+            self._buffer_not_empty.notify()
+
+    def _task_done(self, count: int):
+        with self._buffer_lock:
+            self._unfinished -= count
+            if self._unfinished <= 0:
+                self._unfinished = 0
+                self._all_done.notify_all()
+
+    def _record_drop(self, reason: str, count: int = 1):
+        with self._buffer_lock:
+            self._drop_counts[reason] = self._drop_counts.get(reason, 0) + count
+
+    def get_drop_stats(self) -> Dict[str, int]:
+        with self._buffer_lock:
+            return dict(self._drop_counts)
+
+    def _event_priority(self, event: Dict[str, Any]) -> int:
+        level = event.get('level')
+        event_type = event.get('type')
+
+        if level == 'critical':
+            return 3
+        if event_type == 'error' or level == 'error':
+            return 2
+        if event_type == 'performance':
+            return 0
+        return 1
+
+    def _admit(self, event: Dict[str, Any]) -> bool:
+        size = len(self._buffer)
+
+        if self.overflow_policy == OVERFLOW_SAMPLE:
+            high_water = int(self.queue_size * self.queue_high_water)
+            priority = self._event_priority(event)
+
+            if size >= high_water and priority < 2:
+                free = (self.queue_size - size) / max(1, self.queue_size - high_water)
+                if random.random() >= free ** (2 - priority):
+                    self._record_drop('sampled')
+                    return False
+
+        if size < self.queue_size:
+            return True
+
+        if self.overflow_policy == OVERFLOW_DROP_NEWEST:
+            self._record_drop('queue_full')
+            return False
+
+        self._buffer.popleft()
+        self._unfinished -= 1
+        self._record_drop('queue_evicted')
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._buffer_lock:
+            return self._all_done.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def _send_batches(self, events: List[Dict[str, Any]]) -> List[Optional[str]]:
+        results = []
+        batch = []
+        batch_bytes = 2
+
+        for event in events:
+            try:
+                event = self._materialize(event)
+                if event is None:
+                    results.append(None)
+                    self._task_done(1)
+                    continue
+
+                encoded = dumps(event)
+            except Exception as e:
+                logger.error(f'Error encoding event: {e}')
+                results.append(None)
+                self._task_done(1)
+                continue
+
+            full = len(batch) >= self.batch_max_events
+            too_big = batch and batch_bytes + len(encoded) + 1 > self.batch_max_bytes
+
+            if full or too_big:
+                results.extend(self._send_batch_done(batch))
+                batch = []
+                batch_bytes = 2
+
+            batch.append(encoded)
+            batch_bytes += len(encoded) + 1
+
+        if batch:
+            results.extend(self._send_batch_done(batch))
+
+        return results
+
+    def _send_batch_done(self, encoded_events: List[bytes]) -> List[Optional[str]]:
+        try:
+            return self._send_batch(encoded_events)
+        except Exception as e:
+            logger.error(f'Unexpected error in Streply worker: {e}')
+            return [None] * len(encoded_events)
+        finally:
+            self._task_done(len(encoded_events))
+
+    def _content_encoding(self) -> str:
+        if self.compression != COMPRESSION_AUTO:
+            return self.compression
+
+        return self._server_encoding
+
+    def _build_request(self, encoded_events: List[bytes], batch: bool):
+        headers = self._get_headers()
+
+        if batch:
+            data = b'[' + b','.join(encoded_events) + b']'
+            headers['EventCount'] = str(len(encoded_events))
+        else:
+            data = encoded_events[0]
+
+        encoding = self._content_encoding()
+        if encoding != ENCODING_NONE and len(data) >= self.compression_threshold:
+            data = compress(data, encoding, self.compression_level)
+            headers['Content-Encoding'] = encoding
+
+        return data, headers
+
+    def _send_batch(self, encoded_events: List[bytes]) -> List[Optional[str]]:
+        data, headers = self._build_request(encoded_events, batch=True)
+        item = PendingDelivery(data, headers, encoded_events, batch=True)
+
+        return self._complete(item, self._deliver(item))
 
     def _send_event(self, event: Dict[str, Any]) -> Optional[str]:
-        headers = {
+        event = self._materialize(event)
+        if event is None:
+            return None
+
+        try:
+            encoded = dumps(event)
+        except Exception as e:
+            logger.error(f'Error encoding event: {e}')
+            return None
+
+        data, headers = self._build_request([encoded], batch=False)
+        item = PendingDelivery(data, headers, [encoded], batch=False)
+
+        return self._complete(item, self._deliver(item))[0]
+
+    def _complete(self, item: PendingDelivery, response) -> List[Optional[str]]:
+        if response is None:
+            return [None] * item.count
+
+        if item.batch:
+            return self._handle_batch_response(response, item.count)
+
+        try:
+            event_id = response.json().get('id')
+            self.last_event_id = event_id
+            return [event_id]
+        except Exception as e:
+            logger.error(f'Error parsing response: {e}')
+            return [None]
+
+    def _handle_batch_response(self, response, count: int) -> List[Optional[str]]:
+        try:
+            results = self._parse_batch_response(response.json(), count)
+        except Exception as e:
+            logger.error(f'Error parsing batch response: {e}')
+            return [None] * count
+
+        for event_id in reversed(results):
+            if event_id is not None:
+                self.last_event_id = event_id
+                break
+
+        failed = results.count(None)
+        if failed:
+            logger.debug(f'Streply rejected {failed} of {len(results)} events in batch')
+
+        return results
+
+    def _parse_batch_response(self, response_data, count: int) -> List[Optional[str]]:
+        if isinstance(response_data, dict):
+            response_data = response_data.get('results', response_data.get('ids', []))
+
+        results = []
+        for item in list(response_data)[:count]:
+            if isinstance(item, dict):
+                results.append(item.get('id'))
+            else:
+                results.append(item)
+
+        results.extend([None] * (count - len(results)))
+
+        return results
+
+    def _get_headers(self) -> Dict[str, str]:
+        return {
             'Content-Type': 'application/json',
             'Token': self.public_key,
             'ProjectId': self.project_id
         }
 
-        data = json.dumps(event)
+    def _deliver(self, item: PendingDelivery):
+        if not self._breaker.allow_request():
+            self._park(item, max(self._breaker.retry_in(), self.retry_delay))
+            return None
 
-        for attempt in range(self.retry_max):
-            try:
-                response = requests.post(
-                    url=self.api_url,
-                    data=data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
+        response, error = self._post(item.data, item.headers)
+        status = response.status_code if response is not None else None
 
-                if response.status_code == 200:
-                    try:
-                        response_data = response.json()
-                        event_id = response_data.get('id')
-                        self.last_event_id = event_id
-                        return event_id
-                    except Exception as e:
-                        logger.error(f'Error parsing response: {e}')
-                        return None
-                elif response.status_code == 429:
-                    time.sleep(self.retry_delay * (attempt + 1) * 2)
-                else:
-                    logger.warning(
-                        f'Error sending event to Streply (attempt {attempt + 1}/{self.retry_max}): '
-                        f'HTTP {response.status_code}'
-                    )
-
-                    if attempt < self.retry_max - 1:
-                        time.sleep(self.retry_delay * (attempt + 1))
-            except Exception as e:
-                logger.error(
-                    f'Error sending event to Streply (attempt {attempt + 1}/{self.retry_max}): {e}'
-                )
+        if status == 200:
+            self._record_success(item.count, response)
+            return response
+
+        if status is not None and status < 500 and status not in RETRYABLE_STATUS_CODES:
+            self._breaker.record_success()
+            logger.warning(f'Streply rejected {item.count} events: HTTP {status}')
+            self._record_drop('rejected', item.count)
+            return None
 
-                if attempt < self.retry_max - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
+        self._breaker.record_failure()
+        item.attempt += 1
 
+        reason = f'HTTP {status}' if status is not None else error
+        logger.warning(f'Error sending event to Streply (attempt {item.attempt}/{self.retry_max}): {reason}')
+
+        if item.attempt >= self.retry_max:
+            self._handle_undeliverable(item.encoded_events)
+            return None
+
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+        self._park(item, retry_after if retry_after is not None else self._retry.backoff(item.attempt))
         return None
 
+    def _park(self, item: PendingDelivery, delay: float):
+        if not self._retry.schedule(delay, item):
+            self._handle_undeliverable(item.encoded_events)
+            return
+
+        self._add_unfinished(item.count)
+
+    def _requeue(self, encoded_events: List[bytes], attempt: int = 0):
+        with self._buffer_lock:
+            if self._closed:
+                self._record_drop('closed', len(encoded_events))
+                return
+
+        for encoded in encoded_events:
+            data, headers = self._build_request([encoded], batch=False)
+            self._park(PendingDelivery(data, headers, [encoded], batch=False, attempt=attempt), 0.0)
+
+        if not self._workers_alive():
+            self._start_workers()
+
+    def _record_success(self, count: int, response):
+        self._breaker.record_success()
+
+        self._server_encoding = negotiate_encoding(response.headers.get('Accept-Encoding'))
+
+        with self._buffer_lock:
+            self._delivery_stats['delivered'] += count
+
+        if self._delivery_failed and self._spool is not None:
+            self._delivery_failed = False
+            self._spool.wakeup()
+
+    def _handle_undeliverable(self, encoded_events: List[bytes]):
+        self._delivery_failed = True
+
+        if self._spool is not None:
+            logger.debug(f'Spooling {len(encoded_events)} undeliverable events to disk')
+            self._spool.append(encoded_events)
+
+            with self._buffer_lock:
+                self._delivery_stats['spooled'] += len(encoded_events)
+            return
+
+        logger.warning(f'Dropped {len(encoded_events)} events after {self.retry_max} attempts')
+        self._record_drop('retry_exhausted', len(encoded_events))
+
+    def _replay(self, encoded_events: List[bytes]) -> bool:
+        if self.batch:
+            requests_to_send = [self._build_request(encoded_events, batch=True) + (len(encoded_events),)]
+        else:
+            requests_to_send = [self._build_request([encoded], batch=False) + (1,) for encoded in encoded_events]
+
+        for data, headers, count in requests_to_send:
+            if not self._breaker.allow_request():
+                return False
+
+            response, _ = self._post(data, headers)
+            status = response.status_code if response is not None else None
+
+            if status == 200:
+                self._record_success(count, response)
+            elif status is not None and status < 500 and status not in RETRYABLE_STATUS_CODES:
+                self._breaker.record_success()
+                self._record_drop('rejected', count)
+            else:
+                self._breaker.record_failure()
+                return False
+
+        return True
+
+    @property
+    def circuit_state(self) -> str:
+        return self._breaker.state
+
+    def _post(self, data, headers: Dict[str, str]):
+        try:
+            response = self._get_session().post(
+                url=self.api_url,
+                data=data,
+                headers=headers,
+                timeout=self.timeout
+            )
+            return response, None
+        except Exception as e:
+            return None, e
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        with self._buffer_lock:
+            if self._closed:
+                return self._unfinished == 0
+
+            self._closed = True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = self.flush(timeout)
+
+        with self._buffer_lock:
+            self._running = False
+            self._buffer_not_empty.notify_all()
+
+        for thread in self._worker_threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            thread.join(remaining)
+
+        self._release_pending()
+
+        if self._spool is not None:
+            self._spool.close()
+
+        with self._session_lock:
+            if self._session is not None:
+                self._close_session()
+
+        return flushed
+
+    def _release_pending(self):
+        with self._buffer_lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+            parked = self._retry.pop_all()
+            unfinished = self._unfinished
+
+        spooled = 0
+        if self._spool is not None:
+            encoded_events = []
+            for event in events:
+                try:
+                    event = self._materialize(event)
+                    if event is not None:
+                        encoded_events.append(dumps(event))
+                except Exception as e:
+                    logger.error(f'Error encoding event: {e}')
+
+            for item in parked:
+                encoded_events.extend(item.encoded_events)
+
+            self._spool.append(encoded_events)
+            spooled = len(encoded_events)
+
+        abandoned = max(0, unfinished - spooled)
+
+        with self._buffer_lock:
+            self._delivery_stats['spooled'] += spooled
+            self._delivery_stats['abandoned'] += abandoned
+            if abandoned:
+                self._drop_counts['abandoned'] = self._drop_counts.get('abandoned', 0) + abandoned
+
+            self._unfinished = 0
+            self._all_done.notify_all()
+
+    def get_delivery_stats(self) -> Dict[str, int]:
+        with self._buffer_lock:
+            stats = dict(self._delivery_stats)
+            stats['pending'] = self._unfinished
+
+        return stats
+
     def send(self, event: Dict[str, Any]) -> Optional[str]:
         with self._buffer_lock:
+            if self._closed:
+                self._record_drop('closed')
+                return None
+
+            if not self._admit(event):
+                return None
+
             self._buffer.append(event)
+            self._unfinished += 1
+            self._buffer_not_empty.notify()
 
-        if not self._running or not self._worker_thread.is_alive():
-            self._start_worker()
+        if not self._workers_alive():
+            self._start_workers()
 
         return None
@@ -41,6 +41,15 @@ class BottleIntegration(Integration):
                 except Exception as e:
                     logger.error(f'Error setting up Bottle request context: {e}')
 
+            @bottle.hook('after_request')
+            def after_request():
+                try:
+                    scope = bottle.request.environ.pop('streply.scope', None)
+                    if scope is not None:
+                        self.client.context.pop_scope(scope)
+                except Exception as e:
+                    logger.error(f'Error tearing down Bottle request context: {e}')
+
             logger.debug('Bottle integration enabled')
         except ImportError as e:
             logger.error(f'Error setting up Bottle integration: {e}')
@@ -60,19 +69,19 @@ class BottleIntegration(Integration):
 
             request = bottle.request
 
-            with self.client.configure_scope() as scope:
+            with self.client.push_scope() as scope:
                 scope.set_tag('url', request.url)
                 scope.set_tag('method', request.method)
                 scope.set_tag('route', request.route.rule if request.route else 'unknown')
 
-            self.client.capture_exception(
-                (exc_type, exc_value, tb),
-                params={
-                    'bottle_route': request.route.rule if request.route else 'unknown',
-                    'bottle_method': request.method,
-                    'bottle_path': request.path
-                }
-            )
+                self.client.capture_exception(
+                    (exc_type, exc_value, tb),
+                    params={
+                        'bottle_route': request.route.rule if request.route else 'unknown',
+                        'bottle_method': request.method,
+                        'bottle_path': request.path
+                    }
+                )
         except Exception as e:
             logger.error(f'Error capturing Bottle exception: {e}')
 
@@ -81,6 +90,7 @@ class BottleIntegration(Integration):
             import bottle
 
             request = bottle.request
+            request.environ['streply.scope'] = self.client.context.push_scope()
 
             with self.client.configure_scope() as scope:
                 scope.set_tag('url', request.url)
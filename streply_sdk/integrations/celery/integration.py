@@ -1,6 +1,7 @@
 import logging
 import sys
-from streply.integrations.base import Integration
+from streply_sdk.integrations.base import Integration
+from streply_sdk.utils.safe_repr import ReprBudget, safe_repr
 
 logger = logging.getLogger(__name__)
 
@@ -135,49 +136,44 @@ class CeleryIntegration(Integration):
 
     def _handle_task_failure(self, sender=None, task_id=None, exception=None, args=None, kwargs=None, traceback=None, einfo=None, **kw):
         try:
-            with self.client.configure_scope() as scope:
+            with self.client.push_scope() as scope:
                 scope.set_tag('celery.task_id', task_id)
                 scope.set_tag('celery.task_name', sender.name if sender else 'unknown')
 
+                budget = ReprBudget()
                 if args:
-                    scope.set_extra('celery.args', self._safe_repr(args))
+                    scope.set_extra('celery.args', safe_repr(args, budget=budget))
                 if kwargs:
-                    scope.set_extra('celery.kwargs', self._safe_repr(kwargs))
-
-            if exception and einfo:
-                self.client.capture_exception(
-                    (type(exception), exception, traceback),
-                    level='error',
-                    params={
-                        'celery_task_id': task_id,
-                        'celery_task_name': sender.name if sender else 'unknown'
-                    }
-                )
-            else:
-                self.client.capture_message(
-                    f'Celery task failed: {sender.name if sender else 'unknown'}',
-                    level='error',
-                    params={
-                        'celery_task_id': task_id,
-                        'celery_task_name': sender.name if sender else 'unknown'
-                    }
-                )
+                    scope.set_extra('celery.kwargs', safe_repr(kwargs, budget=budget))
+
+                if exception and einfo:
+                    self.client.capture_exception(
+                        (type(exception), exception, traceback),
+                        level='error',
+                        params={
+                            'celery_task_id': task_id,
+                            'celery_task_name': sender.name if sender else 'unknown'
+                        }
+                    )
+                else:
+                    self.client.capture_message(
+                        f'Celery task failed: {sender.name if sender else "unknown"}',
+                        level='error',
+                        params={
+                            'celery_task_id': task_id,
+                            'celery_task_name': sender.name if sender else 'unknown'
+                        }
+                    )
         except Exception as e:
             logger.error(f'Error handling Celery task failure: {e}')
 
-    def _safe_repr(self, obj):
-        try:
-            return repr(obj)
-        except Exception:
-            return '<non-representable>'
-
     def _handle_task_success(self, sender=None, **kwargs):
         pass
 
     def _handle_task_retry(self, sender=None, request=None, reason=None, einfo=None, **kwargs):
         try:
             self.client.capture_message(
-                f'Celery task retry: {sender.name if sender else 'unknown'}',
+                f'Celery task retry: {sender.name if sender else "unknown"}',
                 level='warning',
                 params={
                     'celery_task_id': request.id if request else 'unknown',
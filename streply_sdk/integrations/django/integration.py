@@ -1,10 +1,13 @@
 from streply_sdk.integrations.base import Integration
+import contextvars
 import logging
 import sys
 import os
 
 logger = logging.getLogger(__name__)
 
+_request_scope = contextvars.ContextVar('streply_django_request_scope', default=None)
+
 
 class DjangoIntegration(Integration):
     @staticmethod
@@ -86,12 +89,24 @@ class DjangoIntegration(Integration):
 
     def _handle_request_started(self, sender, environ=None, **kwargs):
         try:
-            self.client.context.clear_request_data()
+            stale_scope = _request_scope.get()
+            if stale_scope is not None:
+                self.client.context.pop_scope(stale_scope)
+
+            scope = self.client.context.push_scope()
+            scope.clear_request_data()
+            _request_scope.set(scope)
         except Exception as e:
             logger.error(f'Error handling request_started: {e}')
 
     def _handle_request_finished(self, sender, **kwargs):
-        pass
+        try:
+            scope = _request_scope.get()
+            if scope is not None:
+                self.client.context.pop_scope(scope)
+                _request_scope.set(None)
+        except Exception as e:
+            logger.error(f'Error handling request_finished: {e}')
 
     def _add_request_data(self, request):
         try:
@@ -185,7 +200,7 @@ class DjangoIntegration(Integration):
         try:
             from streply_sdk.integrations.logging import StreplyHandler
 
-            handler = StreplyHandler(client=self.client)
+            handler = StreplyHandler(client=self.client, queued=True)
             handler.setLevel(logging.ERROR)
 
             django_logger = logging.getLogger('django')
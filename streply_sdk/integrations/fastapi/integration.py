@@ -2,7 +2,7 @@ import logging
 import sys
 import os
 import inspect
-from streply.integrations.base import Integration
+from streply_sdk.integrations.base import Integration
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +34,7 @@ class FastAPIIntegration(Integration):
                 integration._add_exception_middleware(app_self)
                 integration._add_exception_handlers(app_self)
                 integration._add_request_middleware(app_self)
+                integration._add_shutdown_handler(app_self)
 
                 logger.debug(f'Patched FastAPI app')
 
@@ -89,19 +90,32 @@ class FastAPIIntegration(Integration):
 
             class StreplyRequestMiddleware(BaseHTTPMiddleware):
                 async def dispatch(self, request, call_next):
-                    try:
-                        integration._setup_request_context(request)
-                    except Exception as e:
-                        logger.error(f'Error setting up FastAPI request context: {e}')
+                    with integration.client.push_scope():
+                        try:
+                            integration._setup_request_context(request)
+                        except Exception as e:
+                            logger.error(f'Error setting up FastAPI request context: {e}')
 
-                    response = await call_next(request)
-                    return response
+                        response = await call_next(request)
+                        return response
 
             app.add_middleware(StreplyRequestMiddleware)
             logger.debug('Added FastAPI request middleware')
         except Exception as e:
             logger.error(f'Error adding FastAPI request middleware: {e}')
 
+    def _add_shutdown_handler(self, app):
+        try:
+            integration = self
+
+            async def streply_shutdown():
+                await integration.client.flush_async(integration.client.shutdown_timeout)
+
+            app.router.on_shutdown.append(streply_shutdown)
+            logger.debug('Added FastAPI shutdown handler')
+        except Exception as e:
+            logger.error(f'Error adding FastAPI shutdown handler: {e}')
+
     def _patch_existing_apps(self):
         try:
             import fastapi
@@ -127,6 +141,7 @@ class FastAPIIntegration(Integration):
             self._add_exception_middleware(app)
             self._add_exception_handlers(app)
             self._add_request_middleware(app)
+            self._add_shutdown_handler(app)
 
             logger.debug(f'Patched existing FastAPI app')
         except Exception as e:
@@ -136,7 +151,7 @@ class FastAPIIntegration(Integration):
         try:
             _, _, tb = sys.exc_info()
 
-            with self.client.configure_scope() as scope:
+            with self.client.push_scope() as scope:
                 scope.set_tag('url', str(request.url))
                 scope.set_tag('method', request.method)
                 scope.set_tag('path', request.url.path)
@@ -149,14 +164,14 @@ class FastAPIIntegration(Integration):
                     scope.set_tag('client_host', request.client.host)
                     scope.set_tag('client_port', str(request.client.port))
 
-            self.client.capture_exception(
-                (type(exception), exception, tb),
-                params={
-                    'fastapi_path': request.url.path,
-                    'fastapi_method': request.method,
-                    'fastapi_exception': str(exception)
-                }
-            )
+                self.client.capture_exception(
+                    (type(exception), exception, tb),
+                    params={
+                        'fastapi_path': request.url.path,
+                        'fastapi_method': request.method,
+                        'fastapi_exception': str(exception)
+                    }
+                )
         except Exception as e:
             logger.error(f'Error capturing FastAPI exception: {e}')
     
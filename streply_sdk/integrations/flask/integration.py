@@ -98,6 +98,7 @@ class FlaskIntegration(Integration):
             try:
                 import flask
 
+                flask.g._streply_scope = client.context.push_scope()
                 client.context.clear_request_data()
 
                 request = flask.request
@@ -147,4 +148,13 @@ class FlaskIntegration(Integration):
                 except Exception as e:
                     logger.error(f'Error in Flask teardown_request: {e}')
 
+            try:
+                import flask
+
+                scope = flask.g.pop('_streply_scope', None)
+                if scope is not None:
+                    client.context.pop_scope(scope)
+            except Exception as e:
+                logger.error(f'Error in Flask teardown_request: {e}')
+
         return teardown_request
@@ -1,30 +1,176 @@
+import atexit
 import logging
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
+from streply_sdk import api
+from streply_sdk.core.sampling import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+_SDK_LOGGER_PREFIX = 'streply_sdk'
 
 
 class StreplyHandler(logging.Handler):
-    def __init__(self, client=None, level=logging.NOTSET):
+    def __init__(
+        self,
+        client=None,
+        level=logging.NOTSET,
+        queued: bool = False,
+        queue_size: int = 10000,
+        event_level: int = logging.ERROR,
+        logger_levels: Optional[Dict[str, int]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        default_rate_limit: Optional[float] = None
+    ):
         super().__init__(level)
         self.client = client
+        self.queued = queued
+        self.event_level = event_level
+        self.logger_levels = dict(logger_levels or {})
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate_limit = default_rate_limit
+        self.queue_size = queue_size
+
+        self._queue = queue.Queue(maxsize=queue_size) if queued else None
+        self._listener = None
+        self._listener_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._atexit_registered = False
+        self._threshold_cache = {}
+        self._buckets = {}
+        self._drop_counts = {}
 
     def _get_client(self):
         if self.client:
             return self.client
 
+        return api._client
+
+    def _match_prefix(self, rules: Dict[str, object], name: str):
+        prefix = name
+        while prefix:
+            if prefix in rules:
+                return rules[prefix]
+            prefix = prefix.rpartition('.')[0]
+
+        return None
+
+    def _get_threshold(self, name: str) -> int:
+        try:
+            return self._threshold_cache[name]
+        except KeyError:
+            pass
+
+        threshold = self._match_prefix(self.logger_levels, name) or logging.NOTSET
+
+        if len(self._threshold_cache) < 10000:
+            self._threshold_cache[name] = threshold
+
+        return threshold
+
+    def _get_bucket(self, name: str) -> Optional[TokenBucket]:
         try:
-            import streply_sdk
-            return streply_sdk._ensure_client()
-        except (ImportError, RuntimeError):
-            return None
+            return self._buckets[name]
+        except KeyError:
+            pass
+
+        rate = self._match_prefix(self.rate_limits, name)
+        if rate is None:
+            rate = self.default_rate_limit
+
+        bucket = TokenBucket(rate) if rate else None
+
+        if len(self._buckets) < 10000:
+            self._buckets[name] = bucket
+
+        return bucket
+
+    def _record_drop(self, reason: str):
+        self._drop_counts[reason] = self._drop_counts.get(reason, 0) + 1
+
+    def get_drop_stats(self) -> Dict[str, int]:
+        return dict(self._drop_counts)
+
+    def _accept(self, record) -> bool:
+        if record.name.startswith(_SDK_LOGGER_PREFIX):
+            return False
+
+        if self.logger_levels and record.levelno < self._get_threshold(record.name):
+            return False
+
+        if self.rate_limits or self.default_rate_limit:
+            bucket = self._get_bucket(record.name)
+            if bucket is not None and not bucket.consume():
+                self._record_drop('rate_limited')
+                return False
+
+        return True
 
     def emit(self, record):
+        if not self._accept(record):
+            return
+
         client = self._get_client()
         if not client:
             return
 
+        if not self.queued:
+            self._capture(client, record)
+            return
+
+        self._ensure_listener()
+
+        try:
+            self._queue.put_nowait((client, record, client.context.current_scope.fork()))
+        except queue.Full:
+            self._record_drop('queue_full')
+
+    def _listener_alive(self) -> bool:
+        return self._listener is not None and self._listener.is_alive() and self._pid == os.getpid()
+
+    def _ensure_listener(self):
+        if self._listener_alive():
+            return
+
+        with self._listener_lock:
+            if self._listener_alive():
+                return
+
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = queue.Queue(maxsize=self.queue_size)
+
+            self._listener = threading.Thread(target=self._listen, name='streply-logging', daemon=True)
+            self._listener.start()
+
+            if not self._atexit_registered:
+                atexit.register(self.flush)
+                self._atexit_registered = True
+
+    def _listen(self):
+        while True:
+            item = self._queue.get()
+
+            try:
+                if item is None:
+                    return
+
+                client, record, scope = item
+                with client.context.use_scope(scope):
+                    self._capture(client, record)
+            except Exception:
+                self.handleError(item[1] if item else None)
+            finally:
+                self._queue.task_done()
+
+    def _capture(self, client, record):
         event_type = 'log'
         level = 'normal'
 
-        if record.levelno >= logging.ERROR:
+        if record.levelno >= self.event_level:
             event_type = 'error'
             level = 'normal'
 
@@ -60,3 +206,23 @@ class StreplyHandler(logging.Handler):
                 file=record.pathname,
                 line=record.lineno
             )
+
+    def flush(self):
+        if self._listener is None:
+            return
+
+        self._ensure_listener()
+        self._queue.join()
+
+    def close(self):
+        if self._listener is not None:
+            self.flush()
+            self._queue.put(None)
+            self._listener.join(1.0)
+            self._listener = None
+
+        if self._atexit_registered:
+            atexit.unregister(self.flush)
+            self._atexit_registered = False
+
+        super().close()
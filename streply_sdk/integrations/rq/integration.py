@@ -2,6 +2,7 @@ import logging
 import sys
 import traceback
 from streply_sdk.integrations.base import Integration
+from streply_sdk.utils.safe_repr import ReprBudget, safe_repr
 
 logger = logging.getLogger(__name__)
 
@@ -25,26 +26,14 @@ class RQIntegration(Integration):
 
             self.client = client
 
-            original_job_init = Job.__init__
             original_job_perform = Job.perform
             original_job_handle_failure = Job._handle_failure
             original_worker_handle_exception = Worker.handle_exception
 
             integration = self
 
-            def patched_job_init(job_self, *args, **kwargs):
-                original_job_init(job_self, *args, **kwargs)
-    
-                with client.configure_scope() as scope:
-                    if hasattr(job_self, 'id'):
-                        scope.set_tag('rq.job_id', job_self.id)
-                    if hasattr(job_self, 'func_name'):
-                        scope.set_tag('rq.func_name', job_self.func_name)
-                    if hasattr(job_self, 'origin'):
-                        scope.set_tag('rq.queue', job_self.origin)
-
             def patched_job_perform(job_self):
-                with client.configure_scope() as scope:
+                with client.push_scope() as scope:
                     if hasattr(job_self, 'id'):
                         scope.set_tag('rq.job_id', job_self.id)
                     if hasattr(job_self, 'func_name'):
@@ -52,70 +41,71 @@ class RQIntegration(Integration):
                     if hasattr(job_self, 'origin'):
                         scope.set_tag('rq.queue', job_self.origin)
 
-                try:
-                    client.add_breadcrumb(
-                        category='rq',
-                        message=f'Started RQ job: {job_self.func_name}',
-                        level='info',
-                        data={
-                            'job_id': job_self.id,
-                            'queue': job_self.origin
-                        }
-                    )
-
-                    result = original_job_perform(job_self)
-
-                    client.add_breadcrumb(
-                        category='rq',
-                        message=f'Completed RQ job: {job_self.func_name}',
-                        level='info',
-                        data={
-                            'job_id': job_self.id,
-                            'queue': job_self.origin
-                        }
-                    )
-
-                    return result
-                except Exception as e:
-                    raise
+                    try:
+                        client.add_breadcrumb(
+                            category='rq',
+                            message=f'Started RQ job: {job_self.func_name}',
+                            level='info',
+                            data={
+                                'job_id': job_self.id,
+                                'queue': job_self.origin
+                            }
+                        )
+
+                        result = original_job_perform(job_self)
+
+                        client.add_breadcrumb(
+                            category='rq',
+                            message=f'Completed RQ job: {job_self.func_name}',
+                            level='info',
+                            data={
+                                'job_id': job_self.id,
+                                'queue': job_self.origin
+                            }
+                        )
+
+                        return result
+                    except Exception as e:
+                        raise
 
             def patched_job_handle_failure(job_self, exc_string):
                 exc_info = sys.exc_info()
+                budget = ReprBudget()
 
                 job_info = {
                     'job_id': job_self.id if hasattr(job_self, 'id') else 'unknown',
                     'func_name': job_self.func_name if hasattr(job_self, 'func_name') else 'unknown',
                     'queue': job_self.origin if hasattr(job_self, 'origin') else 'unknown',
-                    'args': repr(job_self.args) if hasattr(job_self, 'args') else '[]',
-                    'kwargs': repr(job_self.kwargs) if hasattr(job_self, 'kwargs') else '{}'
+                    'args': safe_repr(job_self.args, budget=budget) if hasattr(job_self, 'args') else '[]',
+                    'kwargs': safe_repr(job_self.kwargs, budget=budget) if hasattr(job_self, 'kwargs') else '{}'
                 }
 
-                with client.configure_scope() as scope:
+                with client.push_scope() as scope:
                     for key, value in job_info.items():
                         scope.set_tag(f'rq.{key}', value)
 
-                if exc_info and exc_info[0]:
-                    client.capture_exception(
-                        exc_info,
-                        level='error',
-                        params=job_info
-                    )
-                else:
-                    client.capture_message(
-                        f'RQ job failed: {job_self.func_name}',
-                        level='error',
-                        params={
-                            **job_info,
-                            'error': exc_string
-                        }
-                    )
+                    if exc_info and exc_info[0]:
+                        client.capture_exception(
+                            exc_info,
+                            level='error',
+                            params=job_info
+                        )
+                    else:
+                        client.capture_message(
+                            f'RQ job failed: {job_self.func_name}',
+                            level='error',
+                            params={
+                                **job_info,
+                                'error': exc_string
+                            }
+                        )
 
                 return original_job_handle_failure(job_self, exc_string)
 
             def patched_worker_handle_exception(worker_self, job, *exc_info):
                 worker_info = {
                     'worker_name': worker_self.name if hasattr(worker_self, 'name') else 'unknown',
-                    'queues': repr(worker_self.queue_names()) if hasattr(worker_self, 'queue_names') else '[]'
+                    'queues': safe_repr(worker_self.queue_names()) if hasattr(worker_self, 'queue_names') else '[]'
                 }
 
                 job_info = {}
@@ -128,20 +118,19 @@ class RQIntegration(Integration):
 
                 params = {**worker_info, **job_info}
 
-                with client.configure_scope() as scope:
+                with client.push_scope() as scope:
                     for key, value in params.items():
                         scope.set_tag(f'rq.{key}', value)
 
-                if exc_info and exc_info[0]:
-                    client.capture_exception(
-                        exc_info,
-                        level='error',
-                        params=params
-                    )
+                    if exc_info and exc_info[0]:
+                        client.capture_exception(
+                            exc_info,
+                            level='error',
+                            params=params
+                        )
 
                 return original_worker_handle_exception(worker_self, job, *exc_info)
 
-            Job.__init__ = patched_job_init
             Job.perform = patched_job_perform
             Job._handle_failure = patched_job_handle_failure
             Worker.handle_exception = patched_worker_handle_exception
@@ -16,20 +16,21 @@ class WsgiIntegration(Integration):
 
     def middleware(self, wsgi_app):
         def wsgi_middleware(environ, start_response):
-            self._setup_request_context(environ)
-
-            try:
-                return wsgi_app(environ, start_response)
-            except Exception as e:
-                self.client.capture_exception(
-                    (type(e), e, e.__traceback__),
-                    level='error',
-                    request=self._get_request_data(environ)
-                )
-
-                raise
-            finally:
-                self.client.context.clear_request_data()
+            with self.client.push_scope():
+                self._setup_request_context(environ)
+
+                try:
+                    return wsgi_app(environ, start_response)
+                except Exception as e:
+                    self.client.capture_exception(
+                        (type(e), e, e.__traceback__),
+                        level='error',
+                        request=self._get_request_data(environ)
+                    )
+
+                    raise
+                finally:
+                    self.client.context.clear_request_data()
 
         return wsgi_middleware
 
@@ -1,77 +1,217 @@
 import re
-from typing import Any, Dict, List
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
 
 DEFAULT_SENSITIVE_KEYS = [
     'password', 'passwd', 'secret', 'token', 'api_key', 'apikey', 'auth',
     'credential', 'private', 'pwd', 'ssn', 'social_security', 'credit_card',
-    'card', 'cvv', 'cvc', 'expiration', 'pin', 'passphrase', 'key'
+    'card', 'cvv', 'cvc', 'expiration', 'pin', 'passphrase', 'key', 'authorization'
 ]
 
+SENSITIVE_HEADERS = frozenset(('authorization', 'cookie', 'set-cookie', 'x-auth-token', 'x-api-key'))
+
 CREDIT_CARD_PATTERN = re.compile(r'\b(?:\d[ -]*?){13,16}\b')
 
 EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
 
+_SEPARATOR = r'[_\-.\s]'
+_CAMEL_CASE_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
 
-def scrub_dict(data: Dict[str, Any], sensitive_keys: List[str] = None) -> Dict[str, Any]:
-    if sensitive_keys is None:
-        sensitive_keys = DEFAULT_SENSITIVE_KEYS
+_CARD_CANDIDATE_PATTERN = re.compile(r'\d[\d -]{12}')
 
-    result = {}
+REPLACEMENT = '********'
+CREDIT_CARD_REPLACEMENT = '****-****-****-****'
+DEPTH_REPLACEMENT = '[depth limit]'
 
-    for key, value in data.items():
-        contains_sensitive = any(sensitive_key.lower() in key.lower() for sensitive_key in sensitive_keys)
+_SCALAR_TYPES = frozenset((int, float, bool, type(None), bytes))
 
-        if contains_sensitive:
-            result[key] = '********'
-        elif isinstance(value, dict):
-            result[key] = scrub_dict(value, sensitive_keys)
-        elif isinstance(value, list):
-            result[key] = [
-                scrub_dict(item, sensitive_keys) if isinstance(item, dict) else scrub_value(item)
-                for item in value
-            ]
-        else:
-            result[key] = scrub_value(value)
+MAX_DEPTH = 20
+MAX_CACHED_KEYS = 10000
 
-    return result
 
+class Scrubber:
+    def __init__(self, sensitive_keys: Optional[Iterable[str]] = None, scrub_values: bool = True):
+        if sensitive_keys is None:
+            sensitive_keys = DEFAULT_SENSITIVE_KEYS
+
+        keys = sorted({key.lower() for key in sensitive_keys}, key=len, reverse=True)
+
+        self.sensitive_keys = keys
+        self.scrub_values = scrub_values
+
+        self._key_pattern = None
+        if keys:
+            alternatives = '|'.join(re.escape(key).replace('_', _SEPARATOR) for key in keys)
+            self._key_pattern = re.compile(f'(?:^|{_SEPARATOR})(?:{alternatives})s?\\d*(?=$|{_SEPARATOR})')
+        self._key_cache = {}
+
+    def is_sensitive(self, key: Any) -> bool:
+        try:
+            return self._key_cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return False
+
+        sensitive = (
+            self._key_pattern is not None
+            and self._key_pattern.search(_CAMEL_CASE_BOUNDARY.sub('_', str(key)).lower()) is not None
+        )
+
+        if len(self._key_cache) >= MAX_CACHED_KEYS:
+            self._key_cache.clear()
+        self._key_cache[key] = sensitive
+
+        return sensitive
+
+    def scrub_string(self, value: str) -> str:
+        if _CARD_CANDIDATE_PATTERN.search(value) is None:
+            return value
+
+        return CREDIT_CARD_PATTERN.sub(CREDIT_CARD_REPLACEMENT, value)
+
+    def scrub(self, value: Any, depth: int = 0) -> Any:
+        cls = type(value)
+
+        if cls is str:
+            return self.scrub_string(value) if self.scrub_values else value
+
+        if cls in _SCALAR_TYPES:
+            return value
+
+        if cls is dict:
+            return DEPTH_REPLACEMENT if depth >= MAX_DEPTH else self.scrub_mapping(value, depth)
+
+        if cls is list or cls is tuple:
+            return DEPTH_REPLACEMENT if depth >= MAX_DEPTH else self._scrub_sequence(value, depth)
+
+        if isinstance(value, str):
+            return self.scrub_string(value) if self.scrub_values else value
+
+        if isinstance(value, Mapping):
+            return DEPTH_REPLACEMENT if depth >= MAX_DEPTH else self.scrub_mapping(value, depth)
+
+        if isinstance(value, (list, tuple)):
+            return DEPTH_REPLACEMENT if depth >= MAX_DEPTH else self._scrub_sequence(value, depth)
 
-def scrub_value(value: Any) -> Any:
-    if not isinstance(value, str):
         return value
 
-    value = CREDIT_CARD_PATTERN.sub('****-****-****-****', value)
+    def scrub_mapping(self, data: Dict[Any, Any], depth: int = 0) -> Dict[Any, Any]:
+        result = None
 
-    return value
+        for key, value in data.items():
+            if self.is_sensitive(key):
+                scrubbed = REPLACEMENT
+            else:
+                scrubbed = self.scrub(value, depth + 1)
 
+            if scrubbed is not value:
+                if result is None:
+                    result = dict(data) if type(data) is dict else dict(data.items())
+                result[key] = scrubbed
 
-def scrub_request_data(request_data: Dict[str, Any]) -> Dict[str, Any]:
-    result = {}
+        return data if result is None else result
+
+    def _scrub_sequence(self, items, depth: int):
+        result = None
+
+        for i, item in enumerate(items):
+            scrubbed = self.scrub(item, depth + 1)
+
+            if scrubbed is not item:
+                if result is None:
+                    result = list(items)
+                result[i] = scrubbed
+
+        if result is None:
+            return items
+
+        return result if isinstance(items, list) else tuple(result)
 
-    if 'GET' in request_data:
-        result['GET'] = scrub_dict(request_data['GET'])
+    def scrub_params(self, params: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        result = None
 
-    if 'POST' in request_data:
-        result['POST'] = scrub_dict(request_data['POST'])
+        for i, param in enumerate(params):
+            if not isinstance(param, Mapping) or 'name' not in param or 'value' not in param:
+                continue
 
-    if 'JSON' in request_data and request_data['JSON']:
-        if isinstance(request_data['JSON'], dict):
-            result['JSON'] = scrub_dict(request_data['JSON'])
-        else:
-            result['JSON'] = request_data['JSON']
+            value = param['value']
 
-    if 'headers' in request_data:
-        headers = {}
-        for key, value in request_data['headers'].items():
-            if key.lower() in ('authorization', 'cookie', 'set-cookie', 'x-auth-token', 'x-api-key'):
-                headers[key] = '********'
+            if self.is_sensitive(param['name']):
+                scrubbed = REPLACEMENT
             else:
-                headers[key] = value
+                scrubbed = self.scrub(value)
 
-        result['headers'] = headers
+            if scrubbed is not value:
+                if result is None:
+                    result = list(params)
+                result[i] = dict(param.items(), value=scrubbed)
 
-    for key, value in request_data.items():
-        if key not in ('GET', 'POST', 'JSON', 'headers'):
-            result[key] = value
+        return params if result is None else result
 
-    return result
+    def scrub_headers(self, headers: Dict[str, Any]) -> Dict[str, Any]:
+        result = None
+
+        for key, value in headers.items():
+            if str(key).lower() in SENSITIVE_HEADERS and value != REPLACEMENT:
+                if result is None:
+                    result = dict(headers) if type(headers) is dict else dict(headers.items())
+                result[key] = REPLACEMENT
+
+        return headers if result is None else result
+
+    def scrub_request_data(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        result = None
+
+        for key in ('GET', 'POST', 'JSON', 'headers'):
+            value = request_data.get(key)
+
+            if not isinstance(value, Mapping):
+                continue
+
+            if key == 'headers':
+                scrubbed = self.scrub_headers(value)
+            else:
+                scrubbed = self.scrub_mapping(value)
+
+            if scrubbed is not value:
+                if result is None:
+                    result = dict(request_data)
+                result[key] = scrubbed
+
+        return request_data if result is None else result
+
+
+_default_scrubber = Scrubber()
+_scrubbers = {}
+
+
+def get_scrubber(sensitive_keys: Optional[Iterable[str]] = None) -> Scrubber:
+    if sensitive_keys is None:
+        return _default_scrubber
+
+    cache_key = tuple(sensitive_keys)
+    scrubber = _scrubbers.get(cache_key)
+
+    if scrubber is None:
+        if len(_scrubbers) >= 32:
+            _scrubbers.clear()
+        scrubber = _scrubbers[cache_key] = Scrubber(cache_key)
+
+    return scrubber
+
+
+def scrub_dict(data: Dict[str, Any], sensitive_keys: List[str] = None) -> Dict[str, Any]:
+    scrubbed = get_scrubber(sensitive_keys).scrub_mapping(data)
+    return dict(scrubbed) if scrubbed is data else scrubbed
+
+
+def scrub_value(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+
+    return _default_scrubber.scrub_string(value)
+
+
+def scrub_request_data(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(_default_scrubber.scrub_request_data(request_data))
@@ -1,35 +1,119 @@
+import gzip
 import json
 import datetime
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+if orjson is not None:
+    JSON_BACKEND = 'orjson'
+elif ujson is not None:
+    JSON_BACKEND = 'ujson'
+else:
+    JSON_BACKEND = 'json'
+
+ENCODING_GZIP = 'gzip'
+ENCODING_ZSTD = 'zstd'
+ENCODING_NONE = 'none'
+
+
+def default_encoder(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+
+    try:
+        return dict(obj)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return str(obj)
+    except (TypeError, ValueError):
+        return repr(obj)
 
 
 class StreamlyJSONEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, datetime.datetime):
-            return obj.isoformat()
-        if isinstance(obj, datetime.date):
-            return obj.isoformat()
-        if isinstance(obj, uuid.UUID):
-            return str(obj)
-        if isinstance(obj, bytes):
-            return obj.decode('utf-8', errors='replace')
-        if hasattr(obj, 'to_dict'):
-            return obj.to_dict()
+        return default_encoder(obj)
+
 
+def to_json(data: Any) -> str:
+    return json.dumps(data, cls=StreamlyJSONEncoder)
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
         try:
-            return dict(obj)
-        except (TypeError, ValueError):
+            return orjson.dumps(data, default=default_encoder, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
             pass
 
+    if ujson is not None:
         try:
-            return str(obj)
-        except (TypeError, ValueError):
-            return repr(obj)
+            return ujson.dumps(data, default=default_encoder, ensure_ascii=False).encode('utf-8')
+        except (TypeError, ValueError, OverflowError):
+            pass
 
+    return json.dumps(data, cls=StreamlyJSONEncoder).encode('utf-8')
 
-def to_json(data: Any) -> str:
-    return json.dumps(data, cls=StreamlyJSONEncoder)
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    if not accept_encoding:
+        return ENCODING_NONE
+
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, _, quality = part.partition(';q=')
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+
+    if ENCODING_ZSTD in accepted and zstd_available():
+        return ENCODING_ZSTD
+
+    if ENCODING_GZIP in accepted:
+        return ENCODING_GZIP
+
+    return ENCODING_NONE
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == ENCODING_GZIP:
+        return gzip.compress(data, compresslevel=6 if level is None else level)
+
+    if encoding == ENCODING_ZSTD:
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+    raise ValueError(f'Unsupported content encoding: {encoding}')
 
 
 def from_json(data: str) -> Any:
@@ -1,42 +1,33 @@
+import functools
 import sys
 from typing import Dict, Any, Optional
 
-from streply_sdk.utils.data_scrubbing import scrub_request_data, scrub_dict
+from streply_sdk.utils.data_scrubbing import Scrubber, get_scrubber
 
 
-def before_send_hook(event: Dict[str, Any], hint: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+def before_send_hook(
+    event: Dict[str, Any],
+    hint: Dict[str, Any] = None,
+    scrubber: Optional[Scrubber] = None
+) -> Optional[Dict[str, Any]]:
     if hint is None:
         hint = {}
 
-    if 'params' in event and isinstance(event['params'], list):
-        params_dict = {}
-        for param in event['params']:
-            if 'name' in param and 'value' in param:
-                params_dict[param['name']] = param['value']
-
-        cleaned_params_dict = scrub_dict(params_dict)
+    if scrubber is None:
+        scrubber = get_scrubber()
 
-        event['params'] = [
-            {'name': key, 'value': value}
-            for key, value in cleaned_params_dict.items()
-        ]
+    if 'params' in event and isinstance(event['params'], list):
+        event['params'] = scrubber.scrub_params(event['params'])
 
     if 'requestParams' in event and isinstance(event['requestParams'], dict):
-        event['requestParams'] = scrub_request_data(event['requestParams'])
+        event['requestParams'] = scrubber.scrub_request_data(event['requestParams'])
 
     if 'user' in event and isinstance(event['user'], dict) and 'params' in event['user']:
         if isinstance(event['user']['params'], list):
-            user_params_dict = {}
-            for param in event['user']['params']:
-                if 'name' in param and 'value' in param:
-                    user_params_dict[param['name']] = param['value']
+            user_params = scrubber.scrub_params(event['user']['params'])
 
-            cleaned_user_params_dict = scrub_dict(user_params_dict)
-
-            event['user']['params'] = [
-                {'name': key, 'value': value}
-                for key, value in cleaned_user_params_dict.items()
-            ]
+            if user_params is not event['user']['params']:
+                event['user'] = dict(event['user'], params=user_params)
 
     return event
 
@@ -45,20 +36,17 @@ def add_environment_data(event: Dict[str, Any]) -> Dict[str, Any]:
     if 'params' not in event:
         event['params'] = []
 
-    import platform
-    event['params'].append({
-        'name': 'os',
-        'value': platform.platform()
-    })
+    event['params'].extend(dict(param) for param in _get_environment_params())
 
-    event['params'].append({
-        'name': 'python',
-        'value': platform.python_version()
-    })
+    return event
 
-    event['params'].append({
-        'name': 'interpreter',
-        'value': sys.executable
-    })
 
-    return event
+@functools.lru_cache(maxsize=None)
+def _get_environment_params():
+    import platform
+
+    return (
+        {'name': 'os', 'value': platform.platform()},
+        {'name': 'python', 'value': platform.python_version()},
+        {'name': 'interpreter', 'value': sys.executable},
+    )
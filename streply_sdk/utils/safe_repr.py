@@ -0,0 +1,225 @@
+import time
+from collections import OrderedDict, UserDict, UserList, defaultdict, deque
+from collections.abc import Mapping, Sequence, Set
+from typing import Any, Optional
+
+MAX_LENGTH = 512
+MAX_DEPTH = 3
+MAX_ITEMS = 10
+MAX_INT_BITS = 4096
+
+BUDGET_EXCEEDED = '<repr budget exceeded>'
+NON_REPRESENTABLE = '<non-representable>'
+
+EXPENSIVE_TYPES = frozenset((
+    'pandas.core.frame.DataFrame',
+    'pandas.core.series.Series',
+    'pandas.core.indexes.base.Index',
+    'numpy.ndarray',
+    'polars.dataframe.frame.DataFrame',
+    'polars.series.series.Series',
+    'django.db.models.query.QuerySet',
+    'django.db.models.manager.BaseManager',
+    'sqlalchemy.orm.query.Query',
+    'sqlalchemy.orm.session.Session',
+    'sqlalchemy.engine.base.Connection',
+    'requests.models.Response',
+    'httpx.Response',
+    'io.IOBase',
+    '_io._IOBase',
+))
+
+_SIMPLE_TYPES = (type(None), bool, float, complex)
+_SEQUENCE_BRACKETS = {
+    list: ('[', ']'),
+    tuple: ('(', ')'),
+    set: ('{', '}'),
+    frozenset: ('frozenset({', '})'),
+}
+
+_CONTAINER_ABCS = (Mapping, Sequence, Set, deque)
+_BUILTIN_REPRS = frozenset(
+    cls.__repr__
+    for cls in (dict, list, tuple, set, frozenset, deque, OrderedDict, defaultdict, UserDict, UserList)
+)
+
+_expensive_type_cache = {}
+_container_type_cache = {}
+
+
+class ReprBudget:
+    def __init__(self, max_bytes: int = 64 * 1024, max_time: float = 0.05):
+        self.remaining = max_bytes
+        self.deadline = time.perf_counter() + max_time
+
+    def exhausted(self) -> bool:
+        return self.remaining <= 0 or time.perf_counter() > self.deadline
+
+    def consume(self, size: int):
+        self.remaining -= size
+
+
+def _is_expensive_type(cls) -> bool:
+    try:
+        return _expensive_type_cache[cls]
+    except KeyError:
+        pass
+
+    expensive = False
+    for base in getattr(cls, '__mro__', ()):
+        if f'{base.__module__}.{base.__qualname__}' in EXPENSIVE_TYPES:
+            expensive = True
+            break
+
+    if len(_expensive_type_cache) < 4096:
+        _expensive_type_cache[cls] = expensive
+
+    return expensive
+
+
+def _is_plain_container(cls) -> bool:
+    try:
+        return _container_type_cache[cls]
+    except KeyError:
+        pass
+
+    plain = (
+        issubclass(cls, _CONTAINER_ABCS)
+        and not issubclass(cls, (str, bytes, bytearray, memoryview, range))
+        and cls.__repr__ in _BUILTIN_REPRS
+    )
+
+    if len(_container_type_cache) < 4096:
+        _container_type_cache[cls] = plain
+
+    return plain
+
+
+def _repr_container(obj, cls, max_length: int, depth: int, max_depth: int, max_items: int) -> str:
+    is_mapping = isinstance(obj, Mapping)
+    name = cls.__qualname__
+
+    if depth >= max_depth:
+        return f'{name}(...)'
+
+    parts = []
+    length = 0
+    size = len(obj)
+
+    iterator = iter(obj.items()) if is_mapping else iter(obj)
+
+    for item in iterator:
+        if len(parts) >= max_items or length > max_length:
+            break
+
+        if is_mapping:
+            part = (
+                f'{_repr(item[0], max_length, depth + 1, max_depth, max_items)}: '
+                f'{_repr(item[1], max_length, depth + 1, max_depth, max_items)}'
+            )
+        else:
+            part = _repr(item, max_length, depth + 1, max_depth, max_items)
+
+        parts.append(part)
+        length += len(part) + 2
+
+    if len(parts) < size:
+        parts.append(f'...<{size - len(parts)} more>')
+
+    opening, closing = ('{', '}') if is_mapping or isinstance(obj, Set) else ('[', ']')
+
+    return _truncate(f'{name}({opening}{", ".join(parts)}{closing})', max_length)
+
+
+def _truncate(value: str, max_length: int) -> str:
+    if len(value) > max_length:
+        return value[:max_length] + '...'
+    return value
+
+
+def _repr(obj: Any, max_length: int, depth: int, max_depth: int, max_items: int) -> str:
+    cls = type(obj)
+
+    if cls is str or cls is bytes or cls is bytearray:
+        if len(obj) > max_length:
+            return repr(obj[:max_length]) + '...'
+        return repr(obj)
+
+    if cls is int:
+        if obj.bit_length() > MAX_INT_BITS:
+            return f'<int of {obj.bit_length()} bits>'
+        return repr(obj)
+
+    if cls in _SIMPLE_TYPES:
+        return repr(obj)
+
+    if cls in _SEQUENCE_BRACKETS or cls is dict:
+        if cls is dict:
+            opening, closing = '{', '}'
+        else:
+            opening, closing = _SEQUENCE_BRACKETS[cls]
+
+        if not obj:
+            return repr(obj)
+
+        if depth >= max_depth:
+            return f'{opening}...{closing}'
+
+        parts = []
+        length = 0
+
+        if cls is dict:
+            items = obj.items()
+        else:
+            items = obj
+
+        for item in items:
+            if len(parts) >= max_items or length > max_length:
+                break
+
+            if cls is dict:
+                part = (
+                    f'{_repr(item[0], max_length, depth + 1, max_depth, max_items)}: '
+                    f'{_repr(item[1], max_length, depth + 1, max_depth, max_items)}'
+                )
+            else:
+                part = _repr(item, max_length, depth + 1, max_depth, max_items)
+
+            parts.append(part)
+            length += len(part) + 2
+
+        if len(parts) < len(obj):
+            parts.append(f'...<{len(obj) - len(parts)} more>')
+        elif cls is tuple and len(parts) == 1:
+            parts[0] += ','
+
+        return _truncate(f'{opening}{", ".join(parts)}{closing}', max_length)
+
+    if _is_plain_container(cls):
+        return _repr_container(obj, cls, max_length, depth, max_depth, max_items)
+
+    if _is_expensive_type(cls):
+        return f'<{cls.__module__}.{cls.__qualname__} object at {id(obj):#x}>'
+
+    return _truncate(repr(obj), max_length)
+
+
+def safe_repr(
+    obj: Any,
+    max_length: int = MAX_LENGTH,
+    max_depth: int = MAX_DEPTH,
+    max_items: int = MAX_ITEMS,
+    budget: Optional[ReprBudget] = None
+) -> str:
+    if budget is not None and budget.exhausted():
+        return BUDGET_EXCEEDED
+
+    try:
+        value = _repr(obj, max_length, 0, max_depth, max_items)
+    except Exception:
+        value = NON_REPRESENTABLE
+
+    if budget is not None:
+        budget.consume(len(value))
+
+    return value
@@ -1,10 +1,189 @@
-import inspect
+import io
 import linecache
+import mmap
 import os
-from typing import Dict, Any, List
+import threading
+import time
+import tokenize
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from streply_sdk.utils.safe_repr import ReprBudget, safe_repr
+
+
+class _SourceFile:
+    max_windows = 512
+
+    def __init__(self, path: str, size: int, use_mmap: bool):
+        self.mmap = None
+        self.windows = {}
+
+        with open(path, 'rb') as f:
+            if use_mmap and size:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = self.mmap
+            else:
+                self.data = f.read()
+
+        self.size = len(self.data)
+        self.offsets = self._index_lines(self.data)
+        self.encoding = self._detect_encoding()
+
+    def _index_lines(self, data) -> array:
+        offsets = array('Q', [0])
+        find = data.find
+
+        position = find(b'\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = find(b'\n', position + 1)
+
+        return offsets
+
+    def _detect_encoding(self) -> str:
+        head = self.data[:self.offsets[2] if len(self.offsets) > 2 else self.size]
+
+        try:
+            return tokenize.detect_encoding(io.BytesIO(head).readline)[0]
+        except (SyntaxError, LookupError):
+            return 'utf-8'
+
+    def get_line(self, lineno: int) -> Optional[str]:
+        if lineno < 1 or lineno > len(self.offsets):
+            return None
+
+        start = self.offsets[lineno - 1]
+        end = self.offsets[lineno] if lineno < len(self.offsets) else self.size
+
+        if start >= self.size:
+            return None
+
+        line = self.data[start:end].decode(self.encoding, errors='replace')
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+
+        return line
+
+    def get_window(self, start: int, end: int) -> Dict[int, str]:
+        window = self.windows.get((start, end))
+        if window is not None:
+            return window
+
+        window = {}
+        for i in range(start, end + 1):
+            line = self.get_line(i)
+            if line is None:
+                break
+            window[i] = line
+
+        if len(self.windows) >= self.max_windows:
+            self.windows.clear()
+        self.windows[(start, end)] = window
+
+        return window
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+
+class SourceCache:
+    def __init__(
+        self,
+        max_files: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        mmap_threshold: Optional[int] = None,
+        stat_ttl: float = 1.0
+    ):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.stat_ttl = stat_ttl
+
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _load(self, path: str) -> Optional[_SourceFile]:
+        now = time.monotonic()
+        entry = self._entries.get(path)
+
+        if entry is not None:
+            key, checked_at, source = entry
+            if now - checked_at < self.stat_ttl:
+                self._entries.move_to_end(path)
+                return source
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._evict(path)
+            return None
+
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        if entry is not None and entry[0] == key:
+            self._entries[path] = (key, now, entry[2])
+            self._entries.move_to_end(path)
+            return entry[2]
+
+        self._evict(path)
+
+        try:
+            use_mmap = self.mmap_threshold is not None and stat.st_size >= self.mmap_threshold
+            source = _SourceFile(path, stat.st_size, use_mmap)
+        except (OSError, ValueError):
+            return None
+
+        self._entries[path] = (key, now, source)
+        if source.mmap is None:
+            self._memory_bytes += source.size
+
+        while len(self._entries) > self.max_files or self._memory_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            if oldest == path:
+                break
+            self._evict(oldest)
+
+        return source
+
+    def _evict(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return
+
+        source = entry[2]
+        if source.mmap is None:
+            self._memory_bytes -= source.size
+        source.close()
+
+    def get_lines(self, filename: str, lineno: int, context: int = 5) -> Optional[Dict[int, str]]:
+        start = max(1, lineno - context)
+        end = lineno + context
+
+        with self._lock:
+            source = self._load(filename)
+            if source is None:
+                return None
+
+            return dict(source.get_window(start, end))
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._entries):
+                self._evict(path)
+
+
+source_cache = SourceCache()
 
 
 def get_lines_from_file(filename: str, lineno: int, context: int = 5) -> Dict[int, str]:
+    lines = source_cache.get_lines(filename, lineno, context)
+    if lines is not None:
+        return lines
+
     start = max(1, lineno - context)
     end = lineno + context
 
@@ -14,75 +193,129 @@ def get_lines_from_file(filename: str, lineno: int, context: int = 5) -> Dict[in
         if line:
             lines[i] = line
 
-    if not lines and os.path.exists(filename):
-        try:
-            with open(filename, 'r') as f:
-                all_lines = f.readlines()
-                for i in range(start, min(end + 1, len(all_lines) + 1)):
-                    if 0 <= i - 1 < len(all_lines):
-                        lines[i] = all_lines[i - 1]
-        except Exception:
-            pass
-
     return lines
 
 
+class FrameCache:
+    def __init__(self, max_traces: int = 1024):
+        self.max_traces = max_traces
+
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        with self._lock:
+            frames = self._entries.get(fingerprint)
+
+            if frames is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(fingerprint)
+            self._hits += 1
+            return frames
+
+    def put(self, fingerprint, frames):
+        with self._lock:
+            self._entries[fingerprint] = frames
+
+            while len(self._entries) > self.max_traces:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'size': len(self._entries)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+frame_cache = FrameCache()
+
+
+def get_frame_cache_stats() -> Dict[str, Any]:
+    return frame_cache.get_stats()
+
+
+def _get_static_frame(code, lineno: int, cwd: Optional[str]) -> tuple:
+    filename = code.co_filename
+    source = get_lines_from_file(filename, lineno, context=5)
+
+    if cwd and filename.startswith(cwd):
+        filename = filename[len(cwd) + 1:]
+
+    arg_names = code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]
+
+    return filename, code.co_name, arg_names, {str(k): v for k, v in source.items()}
+
+
+def _get_class_name(frame_locals: Dict[str, Any]) -> Optional[str]:
+    try:
+        if 'self' in frame_locals:
+            return frame_locals['self'].__class__.__name__
+        elif 'cls' in frame_locals:
+            return frame_locals['cls'].__name__
+    except Exception:
+        pass
+
+    return None
+
+
 def get_stacktrace(tb, max_frames: int = 50) -> List[Dict[str, Any]]:
     frames = []
-    frame_count = 0
-
-    if tb is not None:
-        current = tb
-        while current and frame_count < max_frames:
-            frame = current.tb_frame
-            filename = frame.f_code.co_filename
-            function = frame.f_code.co_name
-            lineno = current.tb_lineno
-
-            source = get_lines_from_file(filename, lineno, context=5)
-
-            args = inspect.getargvalues(frame) if frame else None
-            arg_list = []
-
-            if args:
-                for arg_name in args.args:
-                    try:
-                        arg_value = args.locals.get(arg_name, '<unavailable>')
-                        arg_list.append({
-                            'name': arg_name,
-                            'value': repr(arg_value)
-                        })
-                    except Exception:
-                        pass
-
-            class_name = None
-            try:
-                if 'self' in frame.f_locals:
-                    class_name = frame.f_locals['self'].__class__.__name__
-                elif 'cls' in frame.f_locals:
-                    class_name = frame.f_locals['cls'].__name__
-            except Exception:
-                pass
-
-            try:
-                cwd = os.getcwd()
-                if filename.startswith(cwd):
-                    filename = filename[len(cwd) + 1:]
-            except Exception:
-                pass
-
-            frame_data = {
-                'file': filename,
-                'line': lineno,
-                'function': function,
-                'class': class_name,
-                'args': arg_list,
-                'source': {str(k): v for k, v in source.items()}
-            }
 
-            frames.append(frame_data)
+    if tb is None:
+        return frames
+
+    chain = []
+    current = tb
+    while current and len(chain) < max_frames:
+        chain.append((current.tb_frame, current.tb_lineno))
+        current = current.tb_next
+
+    try:
+        cwd = os.getcwd()
+    except Exception:
+        cwd = None
+
+    fingerprint = (cwd, tuple((frame.f_code, lineno) for frame, lineno in chain))
+    static_frames = frame_cache.get(fingerprint)
+
+    if static_frames is None:
+        static_frames = [_get_static_frame(frame.f_code, lineno, cwd) for frame, lineno in chain]
+        frame_cache.put(fingerprint, static_frames)
+
+    budget = ReprBudget()
+
+    for (frame, lineno), (filename, function, arg_names, source) in zip(chain, static_frames):
+        frame_locals = frame.f_locals
+        arg_list = []
+
+        for arg_name in arg_names:
+            arg_list.append({
+                'name': arg_name,
+                'value': safe_repr(frame_locals.get(arg_name, '<unavailable>'), budget=budget)
+            })
 
-            current = current.tb_next
-            frame_count += 1
+        frames.append({
+            'file': filename,
+            'line': lineno,
+            'function': function,
+            'class': _get_class_name(frame_locals),
+            'args': arg_list,
+            'source': dict(source)
+        })
 
     return frames